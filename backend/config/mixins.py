@@ -0,0 +1,24 @@
+from .pagination import get_cursor_fields
+from .serializers import get_sparse_fields, trim_queryset
+
+
+class SparseFieldsQuerysetMixin:
+    """
+    Сужает queryset GET-запроса до полей ?fields=/?omit=.
+
+    Сериализатор view должен использовать SparseFieldsMixin: его поля уже
+    отобраны по запросу, и select_related/only() строятся по ним, поэтому
+    ненужные JOIN и колонки не запрашиваются из базы.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if get_sparse_fields(self.request, ()) is None:
+            return queryset
+        serializer = self.get_serializer_class()(
+            context=self.get_serializer_context()
+        )
+        return trim_queryset(
+            queryset, serializer.fields.values(),
+            extra=get_cursor_fields(self)
+        )
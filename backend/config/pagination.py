@@ -0,0 +1,189 @@
+"""
+Keyset-пагинация API.
+
+Вместо OFFSET страница выбирается условием «после последней позиции»
+по упорядочиванию (created_at, id), которое покрыто составным индексом,
+поэтому дальние страницы стоят столько же, сколько первая, и COUNT(*)
+не выполняется. Курсор — подписанная позиция, клиент не может его
+подделать. Включается настройкой API_PAGINATION='cursor'.
+"""
+import datetime
+import json
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_SALT = 'config.pagination.cursor'
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _invert(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+def get_cursor_fields(view):
+    """Поля позиции курсора, если view пагинируется KeysetPagination."""
+    paginator = view.paginator
+    if not isinstance(paginator, KeysetPagination):
+        return []
+    ordering = getattr(view, 'cursor_ordering', paginator.ordering)
+    return [field.lstrip('-') for field in ordering]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по курсору с уникальным упорядочиванием.
+
+    Упорядочивание берется из cursor_ordering view (без него — по pk)
+    и должно заканчиваться уникальным полем; параметр ordering фильтра
+    OrderingFilter при этом не учитывается.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    ordering = ('-pk',)
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(getattr(view, 'cursor_ordering', self.ordering))
+        self.count = None
+
+        position, reverse = self.decode_cursor(request)
+        ordering = (
+            tuple(_invert(field) for field in self.ordering)
+            if reverse else self.ordering
+        )
+        queryset = queryset.order_by(*ordering)
+        if settings.API_PAGINATION_APPROXIMATE_COUNT:
+            self.count = self.get_approximate_count(queryset)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    @staticmethod
+    def after(ordering, position):
+        """
+        Условие «строго после position» в порядке ordering.
+
+        (a, b) > (x, y) раскрывается в a > x OR (a = x AND b > y);
+        ведущее условие a >= x дает базе диапазон по индексу.
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        leading = ordering[0]
+        leading_lookup = 'lte' if leading.startswith('-') else 'gte'
+        return Q(**{
+            f'{leading.lstrip("-")}__{leading_lookup}': position[0]
+        }) & condition
+
+    def get_approximate_count(self, queryset):
+        """Оценка планировщика PostgreSQL, на других СУБД точный COUNT."""
+        if connections[queryset.db].vendor != 'postgresql':
+            return queryset.count()
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return plan[0]['Plan']['Plan Rows']
+
+    def decode_cursor(self, request):
+        """(позиция или None, направление назад) из параметра запроса."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            position, reverse = signing.loads(encoded, salt=CURSOR_SALT)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
+
+    def encode_cursor(self, row, reverse):
+        # Строка — экземпляр модели или словарь values()
+        get = row.get if isinstance(row, dict) else row.__getattribute__
+        position = [
+            _encode_value(get(field.lstrip('-'))) for field in self.ordering
+        ]
+        cursor = signing.dumps(
+            [position, int(reverse)], salt=CURSOR_SALT, compress=True
+        )
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        response = {}
+        if self.count is not None:
+            response['count'] = self.count
+        response.update({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {
+                    'type': 'integer',
+                    'description': 'Примерное общее число записей',
+                },
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {
+                    'type': 'string', 'nullable': True, 'format': 'uri'
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Курсор страницы из ссылок next/previous',
+            'schema': {'type': 'string'},
+        }]
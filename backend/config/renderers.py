@@ -0,0 +1,53 @@
+"""
+JSON на orjson.
+
+Рендерер и парсер для API_JSON_BACKEND='orjson': datetime, date, UUID
+кодируются нативно, Decimal, ленивые строки (gettext_lazy) и остальные
+типы — через default JSONEncoder DRF, как и в стандартном рендерере.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    raise ImproperlyConfigured(
+        "API_JSON_BACKEND='orjson' требует пакет orjson"
+    )
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+_default = JSONEncoder().default
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Рендерер application/json на orjson."""
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        options = OPTIONS
+        if accepted_media_type and 'indent' in accepted_media_type:
+            # orjson поддерживает только отступ в 2 пробела
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=options)
+
+
+class ORJSONParser(BaseParser):
+    """Парсер application/json на orjson."""
+
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
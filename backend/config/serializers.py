@@ -0,0 +1,191 @@
+"""
+Общие сериализаторы API.
+
+ValuesSerializer — быстрый read-only путь для списков: строки берутся
+из queryset.values() только с нужными колонками и превращаются в словари
+заранее скомпилированными функциями, без экземпляров моделей и обхода
+полей DRF на каждой строке. Схема ответа повторяет обычный сериализатор.
+
+SparseFieldsMixin — выбор полей ответа параметрами ?fields= и ?omit=
+для GET-запросов; trim_queryset сужает под них select_related и only().
+"""
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+FIELDS_QUERY_PARAM = 'fields'
+OMIT_QUERY_PARAM = 'omit'
+
+# Поля, значение которых из values() уже совпадает с представлением DRF
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    PrimaryKeyRelatedField,
+)
+
+
+def _parse_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_sparse_fields(request, field_names):
+    """
+    Поля ответа по ?fields= и ?omit= в порядке field_names.
+
+    None, если параметров нет или запрос не GET: ответ не сужается.
+    Неизвестные имена игнорируются.
+    """
+    if request is None or request.method != 'GET':
+        return None
+    params = getattr(request, 'query_params', request.GET)
+    if FIELDS_QUERY_PARAM not in params and OMIT_QUERY_PARAM not in params:
+        return None
+
+    selected = list(field_names)
+    if FIELDS_QUERY_PARAM in params:
+        requested = _parse_names(params[FIELDS_QUERY_PARAM])
+        selected = [name for name in selected if name in requested]
+    if OMIT_QUERY_PARAM in params:
+        omitted = _parse_names(params[OMIT_QUERY_PARAM])
+        selected = [name for name in selected if name not in omitted]
+    return selected
+
+
+def trim_queryset(queryset, fields, extra=()):
+    """
+    select_related и only() ровно под поля сериализатора.
+
+    extra — дополнительные колонки (например, позиция курсора). Если поле
+    нельзя свести к колонкам (SerializerMethodField, вложенный
+    сериализатор, свойство модели), queryset возвращается без изменений.
+    """
+    opts = queryset.model._meta
+    relations = set()
+    columns = {'pk', *extra}
+    for field in fields:
+        if field.source == '*' or isinstance(field, serializers.BaseSerializer):
+            return queryset
+        attrs = field.source_attrs
+        try:
+            model_field = opts.get_field(attrs[0])
+        except FieldDoesNotExist:
+            return queryset
+        if not model_field.concrete:
+            return queryset
+        if len(attrs) > 1:
+            if not (model_field.many_to_one or model_field.one_to_one):
+                return queryset
+            relations.add(attrs[0])
+        columns.add('__'.join(attrs))
+
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*relations)
+    return queryset.only(*columns)
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе поля из ?fields= без полей из ?omit=."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = get_sparse_fields(self.context.get('request'), fields)
+        if selected is None:
+            return fields
+        return {name: fields[name] for name in selected}
+
+
+class ValuesSerializer(serializers.BaseSerializer):
+    """
+    Read-only сериализатор строк values() по схеме serializer_class.
+
+    Поддерживаются поля модели и пути через связи (source='owner.email');
+    если связь пуста, поле пропускается, как это делает DRF. ?fields= и
+    ?omit= запроса из context сужают ответ так же, как SparseFieldsMixin.
+    """
+
+    serializer_class = None
+
+    @classmethod
+    def get_accessors(cls):
+        """[(имя поля, колонка values(), колонка связи, преобразование)]."""
+        accessors = cls.__dict__.get('_accessors')
+        if accessors is None:
+            accessors = cls._accessors = cls.compile()
+        return accessors
+
+    @classmethod
+    def compile(cls):
+        if cls.serializer_class is None:
+            raise ImproperlyConfigured(
+                f'{cls.__name__} требует serializer_class'
+            )
+        accessors = []
+        for name, field in cls.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or isinstance(
+                field, (serializers.BaseSerializer, serializers.SerializerMethodField)
+            ):
+                raise ImproperlyConfigured(
+                    f'{cls.__name__}: поле {name} нельзя получить из values()'
+                )
+            attrs = field.source_attrs
+            convert = (
+                None if isinstance(field, PASSTHROUGH_FIELDS)
+                else field.to_representation
+            )
+            accessors.append((
+                name,
+                '__'.join(attrs),
+                attrs[0] if len(attrs) > 1 else None,
+                convert,
+            ))
+        return accessors
+
+    @classmethod
+    def get_field_names(cls):
+        return [name for name, *_ in cls.get_accessors()]
+
+    @classmethod
+    def get_columns(cls, field_names=None, extra=()):
+        """Колонки для queryset.values(): поля field_names (все) и extra."""
+        columns = {}
+        for name, column, relation, _ in cls.get_accessors():
+            if field_names is not None and name not in field_names:
+                continue
+            columns[column] = None
+            if relation is not None:
+                columns[relation] = None
+        columns.update(dict.fromkeys(extra))
+        return list(columns)
+
+    @classmethod
+    def get_values(cls, queryset, field_names=None, extra=()):
+        """Queryset строк-словарей только с нужными колонками."""
+        return queryset.values(*cls.get_columns(field_names, extra))
+
+    @cached_property
+    def accessors(self):
+        selected = get_sparse_fields(
+            self.context.get('request'), self.get_field_names()
+        )
+        if selected is None:
+            return self.get_accessors()
+        return [
+            accessor for accessor in self.get_accessors()
+            if accessor[0] in selected
+        ]
+
+    def to_representation(self, row):
+        data = {}
+        for name, column, relation, convert in self.accessors:
+            if relation is not None and row[relation] is None:
+                continue
+            value = row[column]
+            if value is not None and convert is not None:
+                value = convert(value)
+            data[name] = value
+        return data
@@ -107,6 +107,23 @@ DATABASES = {
 }
 
 
+# Общий кэш всех воркеров: эпохи и отзыв токенов, сессии, счетчики входа
+# и поколения прав должны быть видны каждому процессу
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": "redis://{}:{}/{}".format(
+            config('REDIS_HOST', default='localhost'),
+            config('REDIS_PORT', default=6379, cast=int),
+            config('REDIS_DB', default=0, cast=int),
+        ),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -158,26 +175,143 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Custom user model
 AUTH_USER_MODEL = 'users.CustomUser'
 
+# Постраничная выдача: 'page' (номера страниц, COUNT и OFFSET) или 'cursor'
+# (keyset по (created_at, id) с непрозрачными курсорами, config.pagination)
+API_PAGINATION = config('API_PAGINATION', default='page')
+# Примерное общее число записей в ответах 'cursor' (оценка планировщика)
+API_PAGINATION_APPROXIMATE_COUNT = config(
+    'API_PAGINATION_APPROXIMATE_COUNT', default=False, cast=bool
+)
+
+# JSON API: 'json' (стандартный json DRF) или 'orjson' (config.renderers)
+API_JSON_BACKEND = config('API_JSON_BACKEND', default='json')
+API_JSON_RENDERER, API_JSON_PARSER = {
+    'json': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.parsers.JSONParser',
+    ),
+    'orjson': (
+        'config.renderers.ORJSONRenderer',
+        'config.renderers.ORJSONParser',
+    ),
+}[API_JSON_BACKEND]
+
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'users.authentication.CustomJWTAuthentication',
+        'users.authentication.OpaqueTokenAuthentication',
+        'users.authentication.APIKeyAuthentication',
         # 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
+        'users.permissions.APIKeyScopePermission',
     ],
-    'DEFAULT_PAGINATION_CLASS': (
-        'rest_framework.pagination.PageNumberPagination'
-    ),
+    'DEFAULT_PAGINATION_CLASS': {
+        'page': 'rest_framework.pagination.PageNumberPagination',
+        'cursor': 'config.pagination.KeysetPagination',
+    }[API_PAGINATION],
     'PAGE_SIZE': 10,
     "DEFAULT_SCHEMA_CLASS": 'drf_spectacular.openapi.AutoSchema',
-    'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+    # Browsable API только при DEBUG
+    'DEFAULT_RENDERER_CLASSES': [API_JSON_RENDERER] + (
+        ['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []
+    ),
+    'DEFAULT_PARSER_CLASSES': [
+        API_JSON_PARSER,
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
+# JWT токены
+JWT_ACCESS_TOKEN_LIFETIME = config(
+    'JWT_ACCESS_TOKEN_LIFETIME', default=300, cast=int
+)  # секунды
+JWT_REFRESH_TOKEN_LIFETIME = config(
+    'JWT_REFRESH_TOKEN_LIFETIME', default=14 * 86400, cast=int
+)  # секунды
+# HS256 (SECRET_KEY) или асимметричная подпись RS256/EdDSA с kid
+JWT_ALGORITHM = config('JWT_ALGORITHM', default='HS256')
+JWT_SIGNING_KEY_ID = config('JWT_SIGNING_KEY_ID', default='')
+JWT_PRIVATE_KEY_FILE = config('JWT_PRIVATE_KEY_FILE', default='')
+# Каталог с открытыми ключами <kid>.pem, действующими при ротации
+JWT_PUBLIC_KEYS_DIR = config('JWT_PUBLIC_KEYS_DIR', default='')
+
+# Тип access-токенов: 'jwt' или 'opaque' (случайная строка, состояние
+# сессии в хранилище AUTH_SESSION_STORE, скользящий срок AUTH_SESSION_LIFETIME)
+AUTH_TOKEN_TYPE = config('AUTH_TOKEN_TYPE', default='jwt')
+AUTH_SESSION_STORE = config(
+    'AUTH_SESSION_STORE', default='users.sessions.CachedDatabaseSessionStore'
+)
+AUTH_SESSION_LIFETIME = config(
+    'AUTH_SESSION_LIFETIME', default=3600, cast=int
+)  # секунды
+
+# Максимальный размер пакета токенов в /auth/introspect/
+AUTH_INTROSPECTION_MAX_TOKENS = config(
+    'AUTH_INTROSPECTION_MAX_TOKENS', default=1000, cast=int
+)
+
+# Ограничение попыток входа (скользящее окно), формат DRF: '<число>/<период>'
+AUTH_LOGIN_THROTTLE_RATES = {
+    'email': config('AUTH_LOGIN_THROTTLE_EMAIL', default='10/min'),
+    'ip': config('AUTH_LOGIN_THROTTLE_IP', default='30/min'),
+    'global': config('AUTH_LOGIN_THROTTLE_GLOBAL', default='1000/min'),
+}
+
+# Стоимость bcrypt. Хеши с другой стоимостью пересчитываются при входе;
+# подобрать значение под бюджет задержки: manage.py benchmark_bcrypt
+AUTH_BCRYPT_ROUNDS = config('AUTH_BCRYPT_ROUNDS', default=12, cast=int)
+
+# Пул хеширования паролей bcrypt: 'thread' или 'process'.
+# MAX_PENDING ограничивает задачи в работе и в очереди, сверх него сразу 503
+AUTH_HASHER_POOL = config('AUTH_HASHER_POOL', default='thread')
+AUTH_HASHER_WORKERS = config('AUTH_HASHER_WORKERS', default=4, cast=int)
+AUTH_HASHER_MAX_PENDING = config(
+    'AUTH_HASHER_MAX_PENDING', default=16, cast=int
+)
+AUTH_HASHER_TIMEOUT = config(
+    'AUTH_HASHER_TIMEOUT', default=5, cast=float
+)  # секунды
+
+# Кэш проверенных JWT токенов в памяти процесса
+AUTH_TOKEN_CACHE_SIZE = config('AUTH_TOKEN_CACHE_SIZE', default=10000, cast=int)
+AUTH_TOKEN_CACHE_TTL = config('AUTH_TOKEN_CACHE_TTL', default=60, cast=int)
+
+# Кэш проверенных API-ключей в памяти процесса. Отзыв ключа в другом
+# процессе виден не позже чем через TTL секунд
+AUTH_API_KEY_CACHE_SIZE = config(
+    'AUTH_API_KEY_CACHE_SIZE', default=1000, cast=int
+)
+AUTH_API_KEY_CACHE_TTL = config('AUTH_API_KEY_CACHE_TTL', default=60, cast=int)
+
+# Снимок пользователя в общем кэше для аутентификации без запроса к БД
+AUTH_USER_SNAPSHOT_TIMEOUT = config(
+    'AUTH_USER_SNAPSHOT_TIMEOUT', default=300, cast=int
+)
+
+# Отзыв токенов: Bloom-фильтр процесса перед общим кэшем.
+# Отзыв из другого процесса виден не позже чем через REFRESH_INTERVAL секунд
+AUTH_REVOCATION_BLOOM_CAPACITY = config(
+    'AUTH_REVOCATION_BLOOM_CAPACITY', default=100000, cast=int
+)
+AUTH_REVOCATION_BLOOM_ERROR_RATE = config(
+    'AUTH_REVOCATION_BLOOM_ERROR_RATE', default=0.001, cast=float
+)
+AUTH_REVOCATION_REFRESH_INTERVAL = config(
+    'AUTH_REVOCATION_REFRESH_INTERVAL', default=5, cast=float
+)
+
+# Диагностические запросы и подробные логи проверки прав (только для отладки)
+PERMISSIONS_DEBUG = config('PERMISSIONS_DEBUG', default=False, cast=bool)
+
+# Максимальный размер пакета проверок в /permissions/check/
+PERMISSIONS_CHECK_MAX_ITEMS = config(
+    'PERMISSIONS_CHECK_MAX_ITEMS', default=500, cast=int
+)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
@@ -261,9 +395,13 @@ SPECTACULAR_SETTINGS = {
     },
     'SERVE_AUTHENTICATION': [
         'users.authentication.CustomJWTAuthentication',
+        'users.authentication.OpaqueTokenAuthentication',
+        'users.authentication.APIKeyAuthentication',
     ],
     'EXTENSIONS': [
         'users.spectacular.CustomJWTAuthenticationScheme',
+        'users.spectacular.OpaqueTokenAuthenticationScheme',
+        'users.spectacular.APIKeyAuthenticationScheme',
     ],
     "COMPONENT_SPLIT_REQUEST": True,
 }
\ No newline at end of file
@@ -26,6 +26,8 @@ GUNICORN_PORT=${GUNICORN_PORT:-8000}
 exec gunicorn config.wsgi:application \
     --bind 0.0.0.0:${GUNICORN_PORT} \
     --workers 3 \
+    --worker-class gthread \
+    --threads ${GUNICORN_THREADS:-4} \
     --timeout 120 \
     --access-logfile - \
     --error-logfile - \
@@ -0,0 +1,76 @@
+import statistics
+import time
+
+import bcrypt
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Команда для замера времени bcrypt на текущем хосте."""
+
+    help = (
+        'Замеряет время хеширования bcrypt для диапазона стоимостей и '
+        'подсказывает максимальную стоимость в пределах бюджета задержки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rounds', type=int, default=10,
+            help='Минимальная стоимость (по умолчанию 10)',
+        )
+        parser.add_argument(
+            '--max-rounds', type=int, default=14,
+            help='Максимальная стоимость (по умолчанию 14)',
+        )
+        parser.add_argument(
+            '--iterations', type=int, default=10,
+            help='Количество замеров на стоимость (по умолчанию 10)',
+        )
+        parser.add_argument(
+            '--budget-ms', type=float, default=250,
+            help='Бюджет p99 на хеширование, мс (по умолчанию 250)',
+        )
+
+    def handle(self, *args, **options):
+        min_rounds = options['min_rounds']
+        max_rounds = options['max_rounds']
+        if not 4 <= min_rounds <= max_rounds <= 31:
+            raise CommandError('Стоимость bcrypt должна быть в диапазоне 4-31')
+
+        password = b'benchmark-password'
+        recommended = None
+
+        self.stdout.write(
+            f"{'cost':>4} {'median, мс':>12} {'p99, мс':>10}"
+        )
+        for rounds in range(min_rounds, max_rounds + 1):
+            timings = []
+            for _ in range(options['iterations']):
+                salt = bcrypt.gensalt(rounds)
+                started = time.perf_counter()
+                bcrypt.hashpw(password, salt)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            timings.sort()
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            self.stdout.write(
+                f'{rounds:>4} {statistics.median(timings):>12.1f} {p99:>10.1f}'
+            )
+            if p99 <= options['budget_ms']:
+                recommended = rounds
+            else:
+                # Каждая следующая стоимость вдвое дороже
+                break
+
+        self.stdout.write(
+            f'Текущее значение AUTH_BCRYPT_ROUNDS: {settings.AUTH_BCRYPT_ROUNDS}'
+        )
+        if recommended is None:
+            self.stdout.write(self.style.WARNING(
+                'Ни одна стоимость не укладывается в бюджет'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Рекомендуемая стоимость: {recommended}'
+            ))
@@ -0,0 +1,91 @@
+import statistics
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from mock_resources.models import Resource
+from mock_resources.serializers import ResourceSerializer
+from permissions.models import ResourceType
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    """Команда для сравнения скорости JSON-рендереров."""
+
+    help = (
+        'Замеряет время рендеринга ответа ResourceSerializer стандартным '
+        'JSONRenderer и ORJSONRenderer (API_JSON_BACKEND). Данные строятся '
+        'в памяти, база не используется'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=1000,
+            help='Количество ресурсов в ответе (по умолчанию 1000)',
+        )
+        parser.add_argument(
+            '--iterations', type=int, default=50,
+            help='Количество замеров на рендерер (по умолчанию 50)',
+        )
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['iterations'] < 1:
+            raise CommandError('Параметры должны быть положительными')
+
+        renderers = {'json': JSONRenderer()}
+        try:
+            from config.renderers import ORJSONRenderer
+            renderers['orjson'] = ORJSONRenderer()
+        except ImproperlyConfigured as error:
+            self.stdout.write(self.style.WARNING(str(error)))
+
+        data = {'results': ResourceSerializer(
+            self.build_resources(options['rows']), many=True
+        ).data}
+
+        self.stdout.write(
+            f"{'рендерер':>10} {'median, мс':>12} {'p95, мс':>10} {'КБ':>8}"
+        )
+        medians = {}
+        for name, renderer in renderers.items():
+            timings = []
+            for _ in range(options['iterations']):
+                started = time.perf_counter()
+                content = renderer.render(data, 'application/json')
+                timings.append((time.perf_counter() - started) * 1000)
+
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            medians[name] = statistics.median(timings)
+            self.stdout.write(
+                f'{name:>10} {medians[name]:>12.2f} {p95:>10.2f} '
+                f'{len(content) / 1024:>8.1f}'
+            )
+
+        if 'orjson' in medians:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ orjson быстрее в {medians['json'] / medians['orjson']:.1f} раза"
+            ))
+
+    def build_resources(self, rows):
+        """Ресурсы со связанными типом и владельцем, без сохранения в БД."""
+        now = timezone.now()
+        resource_types = [
+            ResourceType(id=n, name=f'type_{n}') for n in range(1, 11)
+        ]
+        owners = [
+            CustomUser(id=n, email=f'user{n}@example.com')
+            for n in range(1, 101)
+        ]
+        return [
+            Resource(
+                id=n, name=f'Ресурс {n}',
+                resource_type=resource_types[n % len(resource_types)],
+                owner=owners[n % len(owners)],
+                created_at=now, updated_at=now,
+            )
+            for n in range(1, rows + 1)
+        ]
@@ -0,0 +1,53 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+
+from users.models import APIKey
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Команда для выпуска API-ключа сервисного клиента."""
+
+    help = (
+        'Создает API-ключ. Пример: create_api_key --email svc@example.com '
+        '--name gateway --scope product:read,create --scope order:read'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email', required=True, help='Email пользователя-владельца'
+        )
+        parser.add_argument('--name', required=True, help='Название ключа')
+        parser.add_argument(
+            '--scope',
+            action='append',
+            default=[],
+            help='Права ключа: <тип ресурса>:<действие>[,<действие>]',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['email'], is_active=True)
+        except User.DoesNotExist:
+            raise CommandError(f"Пользователь {options['email']} не найден")
+
+        scopes = {}
+        for scope in options['scope']:
+            resource_type, _, actions = scope.partition(':')
+            scopes[resource_type] = [
+                action for action in actions.split(',') if action
+            ]
+
+        try:
+            APIKey(user=user, name=options['name'], scopes=scopes).clean()
+        except ValidationError as error:
+            raise CommandError('; '.join(error.messages))
+
+        api_key, key = APIKey.objects.issue(user, options['name'], scopes)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Ключ {api_key} создан. Сохраните его, повторно он не выводится:'
+        ))
+        self.stdout.write(key)
@@ -0,0 +1,167 @@
+import json
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from mock_resources.models import Resource
+from permissions.models import Role, UserRole, ResourceType
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    """Команда для проверки планов горячих запросов."""
+
+    help = (
+        'Заполняет таблицы тестовыми данными заданного объема (в транзакции, '
+        'которая затем откатывается), выполняет EXPLAIN для горячих запросов '
+        'авторизации и списков и завершается ошибкой, если план читает '
+        'последовательно одну из больших таблиц (пользователи, роли '
+        'пользователей, ресурсы). Только для PostgreSQL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=100000,
+            help='Число пользователей, ролей пользователей и ресурсов '
+                 '(по умолчанию 100000)',
+        )
+        parser.add_argument(
+            '--resource-types', type=int, default=200,
+            help='Число типов ресурсов (по умолчанию 200)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Команда требует PostgreSQL')
+        if options['rows'] < 1 or options['resource_types'] < 1:
+            raise CommandError('Объем данных должен быть положительным')
+
+        with transaction.atomic():
+            self.seed(options['rows'], options['resource_types'])
+            failures = self.explain_all()
+            # Тестовые данные не сохраняются
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(
+                'Последовательное сканирование: ' + ', '.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Все горячие запросы используют индексы'
+        ))
+
+    def seed(self, rows, resource_types_count):
+        """Создает тестовые данные одним bulk_create на таблицу."""
+        self.stdout.write(f'Заполнение таблиц: {rows} строк...')
+        run = uuid.uuid4().hex[:8]
+        now = timezone.now()
+
+        role = Role.objects.create(name=f'explain_{run}')
+        resource_types = ResourceType.objects.bulk_create(
+            ResourceType(name=f'explain_{run}_{n}', is_active=n % 10 != 0)
+            for n in range(resource_types_count)
+        )
+        users = User.objects.bulk_create(
+            (
+                User(
+                    email=f'explain_{run}_{n}@example.com',
+                    first_name='Explain', last_name=str(n),
+                    password='!', date_joined=now, is_active=n % 20 != 0,
+                )
+                for n in range(rows)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        UserRole.objects.bulk_create(
+            (
+                UserRole(user=user, role=role, is_active=n % 5 != 0)
+                for n, user in enumerate(users)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        Resource.objects.bulk_create(
+            (
+                Resource(
+                    name=f'explain {n}', owner=users[n],
+                    resource_type=resource_types[n % resource_types_count],
+                )
+                for n in range(rows)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+        with connection.cursor() as cursor:
+            for model in (User, ResourceType, UserRole, Resource):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+        # Маленькие справочники (роли, типы) планировщик вправе читать целиком
+        self.large_tables = {
+            model._meta.db_table for model in (User, UserRole, Resource)
+        }
+        self.user = users[len(users) // 2]
+        self.resource_type = resource_types[1]
+
+    def hot_queries(self):
+        """Горячие запросы авторизации и списков."""
+        return {
+            'роли пользователя': UserRole.objects.filter(
+                user=self.user, is_active=True
+            ).order_by('role__name').values('role__name'),
+            'my_resources': Resource.objects.filter(
+                owner=self.user
+            ).order_by('-created_at', '-id')[:10],
+            'ресурсы по типу': Resource.objects.filter(
+                resource_type=self.resource_type
+            ).order_by('-created_at', '-id')[:10],
+            'активный тип по имени': ResourceType.objects.filter(
+                name=self.resource_type.name, is_active=True
+            ),
+            'активные типы': ResourceType.objects.filter(
+                is_active=True
+            ).order_by('name')[:10],
+            'активный пользователь по email': User.objects.filter(
+                email=self.user.email, is_active=True
+            ),
+            'список пользователей': User.objects.filter(
+                is_active=True
+            ).order_by('-date_joined', '-id')[:10],
+        }
+
+    def explain_all(self):
+        """Выводит план каждого запроса, возвращает имена с Seq Scan."""
+        failures = []
+        for name, queryset in self.hot_queries().items():
+            plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+            seq_scans = sorted(self.seq_scans(plan) & self.large_tables)
+            if seq_scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(
+                    f'❌ {name}: Seq Scan по {", ".join(seq_scans)}'
+                ))
+            else:
+                self.stdout.write(f'✓ {name}: {self.describe(plan)}')
+        return failures
+
+    def seq_scans(self, plan):
+        """Таблицы, которые план читает последовательным сканированием."""
+        found = set()
+        if plan['Node Type'] == 'Seq Scan':
+            found.add(plan['Relation Name'])
+        for child in plan.get('Plans', ()):
+            found |= self.seq_scans(child)
+        return found
+
+    def describe(self, plan):
+        """Краткое описание плана: узлы сканирования с индексами."""
+        nodes = []
+        if 'Index Name' in plan:
+            nodes.append(f"{plan['Node Type']} using {plan['Index Name']}")
+        for child in plan.get('Plans', ()):
+            nodes.append(self.describe(child))
+        return '; '.join(node for node in nodes if node) or plan['Node Type']
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from users.models import AuthSession, RefreshToken
+
+
+class Command(BaseCommand):
+    """Команда для удаления истекших refresh-токенов и сессий."""
+
+    help = (
+        'Удаляет refresh-токены и сессии opaque-токенов с истекшим сроком '
+        'действия. Отозванные и замененные при ротации refresh-токены '
+        'хранятся до истечения срока: по ним обнаруживается повторное '
+        'использование. Запускайте периодически (cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Строк за один DELETE (по умолчанию 5000)',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным')
+
+        now = timezone.now()
+        for model in (RefreshToken, AuthSession):
+            deleted = self.purge(model, now, options['batch_size'])
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: удалено {deleted}'
+            )
+        self.stdout.write(self.style.SUCCESS('✅ Очистка завершена'))
+
+    def purge(self, model, now, batch_size):
+        """Удаляет истекшие строки пакетами по индексу expires_at."""
+        deleted = 0
+        while True:
+            batch = list(model.objects.filter(
+                expires_at__lte=now
+            ).values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                return deleted
+            deleted += model.objects.filter(pk__in=batch).delete()[0]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mock_resources", "0002_alter_resource_owner_alter_resource_resource_type"),
+        ("permissions", "0005_resourcetype_alter_rolepermission_options_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="resource",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="resources_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mock_resources", "0003_resource_resources_created_id_idx"),
+        ("permissions", "0006_hot_query_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="resource",
+            index=models.Index(
+                fields=["owner", "-created_at", "-id"],
+                name="resources_owner_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="resource",
+            index=models.Index(
+                fields=["resource_type", "-created_at", "-id"],
+                name="resources_type_created_idx",
+            ),
+        ),
+    ]
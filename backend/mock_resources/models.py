@@ -39,6 +39,21 @@ class Resource(models.Model):
         verbose_name = 'Ресурс'
         verbose_name_plural = 'Ресурсы'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset-пагинация по (created_at, id)
+            models.Index(
+                fields=['-created_at', '-id'], name='resources_created_id_idx'
+            ),
+            # my_resources и выборки по типу в порядке пагинации
+            models.Index(
+                fields=['owner', '-created_at', '-id'],
+                name='resources_owner_created_idx'
+            ),
+            models.Index(
+                fields=['resource_type', '-created_at', '-id'],
+                name='resources_type_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.resource_type.name})"
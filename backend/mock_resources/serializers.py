@@ -1,11 +1,12 @@
 from rest_framework import serializers
 
+from config.serializers import SparseFieldsMixin, ValuesSerializer
 from permissions.models import ResourceType
-from permissions.utils import can_user_access_resource
+from permissions.utils import get_request_permissions
 from .models import Resource
 
 
-class ResourceSerializer(serializers.ModelSerializer):
+class ResourceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для ресурсов."""
     
     resource_type_name = serializers.CharField(
@@ -38,12 +39,20 @@ class ResourceSerializer(serializers.ModelSerializer):
     
     def validate(self, data):
         """Валидация прав доступа."""
-        user = self.context['request'].user
+        request = self.context['request']
         resource_type = data.get('resource_type')
         
         if resource_type:
+            # API-ключ ограничивает права владельца своими scopes
+            scope_allows = getattr(request.auth, 'allows', None)
+            if scope_allows is not None and not scope_allows(
+                resource_type, 'create'
+            ):
+                raise serializers.ValidationError(
+                    f"API-ключ не дает права create для ресурса '{resource_type.name}'"
+                )
             # Проверяем права на создание ресурса данного типа
-            if not can_user_access_resource(user, resource_type, 'create'):
+            if not get_request_permissions(request).can(resource_type, 'create'):
                 raise serializers.ValidationError(
                     f"Недостаточно прав для создания ресурса типа '{resource_type.name}'"
                 )
@@ -51,6 +60,12 @@ class ResourceSerializer(serializers.ModelSerializer):
         return data
 
 
+class ResourceListSerializer(ValuesSerializer):
+    """Быстрый сериализатор списков ресурсов по строкам values()."""
+
+    serializer_class = ResourceSerializer
+
+
 class ResourceCreateSerializer(ResourceSerializer):
     """Сериализатор для создания ресурсов."""
 
@@ -3,28 +3,47 @@ from rest_framework import viewsets, permissions, filters
 from rest_framework.response import Response
 from rest_framework.decorators import action
 
+from config.mixins import SparseFieldsQuerysetMixin
+from config.pagination import get_cursor_fields
+from config.serializers import get_sparse_fields
+from users.permissions import APIKeyScopePermission
 from users.spectacular import CustomJWTAuthenticationScheme
+from permissions.filters import ResourcePermissionFilter
 from permissions.decorators import (
     require_user_or_higher,
     require_dynamic_permission
 )
+from permissions.mixins import CachedObjectMixin
 from permissions.models import ResourceType
+from permissions.utils import get_request_permissions
 from .models import Resource
 from .serializers import (
-    ResourceSerializer, ResourceCreateSerializer, 
+    ResourceSerializer, ResourceCreateSerializer, ResourceListSerializer,
     ResourceUpdateSerializer, ResourceTypeSerializer
 )
 
 
-class ResourceViewSet(viewsets.ModelViewSet):
+class ResourceViewSet(
+    CachedObjectMixin, SparseFieldsQuerysetMixin, viewsets.ModelViewSet
+):
     """ViewSet для управления ресурсами с динамическими типами."""
 
-    queryset = Resource.objects.all()
+    # Права применяет ResourcePermissionFilter, поля — ?fields=/?omit=
+    queryset = Resource.objects.select_related('resource_type', 'owner')
     serializer_class = ResourceSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, APIKeyScopePermission]
+    filter_backends = [
+        ResourcePermissionFilter, filters.SearchFilter, filters.OrderingFilter
+    ]
     search_fields = ['name', 'resource_type__name']
     ordering_fields = ['name', 'created_at', 'updated_at']
     ordering = ['-created_at']
+    cursor_ordering = ('-created_at', '-id')
+    # Действия, где права API-ключа ограничены его scopes
+    api_key_actions = (
+        'list', 'retrieve', 'create', 'update', 'partial_update', 'destroy',
+        'available_types', 'my_resources',
+    )
 
     def get_serializer_class(self):
         """Выбираем сериализатор в зависимости от действия."""
@@ -41,20 +60,27 @@ class ResourceViewSet(viewsets.ModelViewSet):
             return []
         return super().get_permissions()
 
-    def get_queryset(self):
-        """Фильтруем ресурсы в зависимости от роли пользователя."""
-        queryset = super().get_queryset().select_related('resource_type', 'owner')
+    def list_values(self, queryset):
+        """Ответ списка через values() и ResourceListSerializer."""
+        queryset = ResourceListSerializer.get_values(
+            queryset,
+            get_sparse_fields(
+                self.request, ResourceListSerializer.get_field_names()
+            ),
+            extra=get_cursor_fields(self)
+        )
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = ResourceListSerializer(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
 
-        if not self.request.user.is_authenticated:
-            # Гости видят только активные ресурсы
-            return queryset.filter(resource_type__is_active=True)
-        
-        # Для аутентифицированных пользователей применяем декораторы
-        return queryset
+        serializer = ResourceListSerializer(queryset, many=True, context=context)
+        return Response(serializer.data)
 
     @extend_schema(tags=['resources'], summary='Список ресурсов')
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.list_values(self.filter_queryset(self.get_queryset()))
 
     @extend_schema(tags=['resources'], summary='Детали ресурса')
     def retrieve(self, request, *args, **kwargs):
@@ -92,11 +118,16 @@ class ResourceViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def available_types(self, request):
         """Получение доступных типов ресурсов для создания."""
-        user = request.user
+        request_permissions = get_request_permissions(request)
+        scope_allows = getattr(request.auth, 'allows', None)
         available_types = []
         
         for resource_type in ResourceType.objects.filter(is_active=True):
-            if can_user_access_resource(user, resource_type, 'create'):
+            if scope_allows is not None and not scope_allows(
+                resource_type, 'create'
+            ):
+                continue
+            if request_permissions.can(resource_type, 'create'):
                 available_types.append(resource_type)
         
         serializer = ResourceTypeSerializer(available_types, many=True)
@@ -126,11 +157,6 @@ class ResourceViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_resources(self, request):
         """Ресурсы текущего пользователя."""
-        queryset = self.get_queryset().filter(owner=request.user)
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.list_values(self.filter_queryset(
+            self.get_queryset().filter(owner=request.user)
+        ))
@@ -0,0 +1,218 @@
+"""
+Кэш разрешений на счетчиках поколений.
+
+Матрица роль × тип ресурса → битовая маска загружается одним запросом
+и хранится в памяти процесса. Ее версия — глобальный счетчик поколений
+в общем кэше: любое изменение ролей, разрешений или типов ресурсов
+увеличивает счетчик, и каждый процесс лениво перестраивает матрицу при
+следующей проверке.
+
+Роли пользователя кэшируются вместе с поколениями, при которых они
+прочитаны: глобальным и поколением пользователя (его UserRole); маски
+берутся из матрицы. Запись с устаревшим поколением считается промахом,
+поэтому TTL можно держать в часах без риска выдать устаревшие права.
+
+Внутри транзакции поколение увеличивается дважды: сразу и после фиксации.
+Иначе параллельный запрос может прочитать новое поколение вместе с еще
+не зафиксированными старыми строками и закэшировать их надолго.
+"""
+from functools import partial
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .constants import (
+    CAN_CREATE, CAN_DELETE, CAN_DELETE_OTHERS, CAN_READ, CAN_UPDATE,
+    CAN_UPDATE_OTHERS, PERMISSIONS_GENERATION_KEY, USER_GENERATION_KEY,
+    USER_ROLES_CACHE_TIMEOUT, USER_ROLES_KEY
+)
+
+
+def _initial_generation():
+    # После очистки кэша счетчик начинается с метки времени, а не с 1:
+    # иначе запись, прочитанная до очистки, может совпасть с новым счетчиком
+    return time.time_ns()
+
+
+def _get_generation(key):
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _initial_generation(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bump_generation(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_generation(), timeout=None)
+        return cache.incr(key)
+
+
+def _bump_generation_on_commit(key):
+    generation = _bump_generation(key)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(_bump_generation, key))
+    return generation
+
+
+def get_permissions_generation():
+    """Текущее поколение разрешений."""
+    return _get_generation(PERMISSIONS_GENERATION_KEY)
+
+
+def bump_permissions_generation():
+    """Увеличивает поколение: все процессы перестроят матрицу."""
+    return _bump_generation_on_commit(PERMISSIONS_GENERATION_KEY)
+
+
+def bump_user_generation(user_id):
+    """Увеличивает поколение ролей пользователя."""
+    return _bump_generation_on_commit(USER_GENERATION_KEY.format(user_id))
+
+
+def user_cache_keys(user_id):
+    """Ключи, нужные для чтения кэша прав пользователя."""
+    return [
+        USER_ROLES_KEY.format(user_id),
+        PERMISSIONS_GENERATION_KEY,
+        USER_GENERATION_KEY.format(user_id),
+    ]
+
+
+def get_user_generations(user_id):
+    """Поколения (глобальное, пользователя) — версия прав пользователя."""
+    _, global_key, user_key = user_cache_keys(user_id)
+    found = cache.get_many([global_key, user_key])
+    return tuple(
+        found[key] if key in found else _get_generation(key)
+        for key in (global_key, user_key)
+    )
+
+
+def get_user_cache(user_id, found=None):
+    """
+    Закэшированное значение пользователя и поколения для записи.
+
+    found — результат cache.get_many, если ключи user_cache_keys уже
+    прочитаны вместе с другими. Значение None означает промах.
+    """
+    role_key, global_key, user_key = user_cache_keys(user_id)
+    if found is None:
+        found = cache.get_many([role_key, global_key, user_key])
+    generations = (found.get(global_key), found.get(user_key))
+    if None in generations:
+        # Счетчики создаются до чтения из БД, чтобы запись не получила
+        # поколение, выданное после изменения
+        return None, (
+            _get_generation(global_key), _get_generation(user_key)
+        )
+
+    entry = found.get(role_key)
+    if entry is not None:
+        entry_generations, value = entry
+        if entry_generations == generations:
+            return value, generations
+    return None, generations
+
+
+def user_cache_entry(user_id, value, generations):
+    """Пара (ключ, запись) для cache.set_many."""
+    return USER_ROLES_KEY.format(user_id), (generations, value)
+
+
+def set_user_cache(user_id, value, generations):
+    """Кэширует значение пользователя с поколениями, прочитанными до БД."""
+    key, entry = user_cache_entry(user_id, value, generations)
+    cache.set(key, entry, USER_ROLES_CACHE_TIMEOUT)
+
+
+def permission_mask(can_create, can_read, can_update, can_delete,
+                    can_manage_others):
+    """Битовая маска из флагов RolePermission."""
+    mask = 0
+    if can_create:
+        mask |= CAN_CREATE
+    if can_read:
+        mask |= CAN_READ
+    if can_update:
+        mask |= CAN_UPDATE
+        if can_manage_others:
+            mask |= CAN_UPDATE_OTHERS
+    if can_delete:
+        mask |= CAN_DELETE
+        if can_manage_others:
+            mask |= CAN_DELETE_OTHERS
+    return mask
+
+
+class PermissionMatrix:
+    """Матрица {роль: {тип ресурса: маска}} активных типов ресурсов."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (поколение, матрица, объединенные маски по наборам ролей)
+        self._state = None
+
+    def get(self, generation=None):
+        """
+        Актуальная матрица, перестраивается при смене поколения.
+
+        generation — уже прочитанное глобальное поколение (например,
+        вместе с кэшем пользователя), иначе оно читается из кэша.
+        """
+        return self._current(generation)[1]
+
+    def mask(self, role_name, resource_type_name):
+        """Маска прав роли на тип ресурса, 0 если разрешения нет."""
+        return self.get().get(role_name, {}).get(resource_type_name, 0)
+
+    def masks(self, roles, generation=None):
+        """Объединение (OR) масок ролей по типам ресурсов."""
+        _, matrix, combined = self._current(generation)
+        masks = combined.get(roles)
+        if masks is None:
+            masks = {}
+            for role_name in roles:
+                for name, mask in matrix.get(role_name, {}).items():
+                    masks[name] = masks.get(name, 0) | mask
+            combined[roles] = masks
+        return masks
+
+    def reset(self):
+        """Сбрасывает матрицу процесса."""
+        with self._lock:
+            self._state = None
+
+    def _current(self, generation):
+        if generation is None:
+            generation = get_permissions_generation()
+        state = self._state
+        if state is None or state[0] != generation:
+            with self._lock:
+                state = self._state
+                if state is None or state[0] != generation:
+                    state = self._state = (generation, self._build(), {})
+        return state
+
+    def _build(self):
+        from .models import RolePermission
+
+        matrix = {}
+        rows = RolePermission.objects.filter(
+            resource_type__is_active=True
+        ).values_list(
+            'role__name', 'resource_type__name', 'can_create', 'can_read',
+            'can_update', 'can_delete', 'can_manage_others'
+        )
+        for role_name, resource_type_name, *flags in rows:
+            matrix.setdefault(role_name, {})[resource_type_name] = (
+                permission_mask(*flags)
+            )
+        return matrix
+
+
+permission_matrix = PermissionMatrix()
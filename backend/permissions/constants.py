@@ -2,9 +2,12 @@
 Константы для системы разрешений.
 """
 
-# Кэш
-PERMISSION_CACHE_TIMEOUT = 300  # 5 минут
-USER_ROLES_CACHE_TIMEOUT = 600  # 10 минут
+# Кэш. Записи проверяются по счетчикам поколений, поэтому TTL только
+# ограничивает память, а не срок устаревания
+USER_ROLES_CACHE_TIMEOUT = 6 * 3600  # 6 часов
+
+# Приоритет ролей: первая из найденных у пользователя считается основной
+ROLE_PRIORITY = ('admin', 'manager', 'user')
 
 # Типы ресурсов
 RESOURCE_TYPES = [
@@ -12,3 +15,29 @@ RESOURCE_TYPES = [
         ('order', 'Заказ'),
         ('user', 'Пользователь'),
     ]
+
+# Битовая маска прав роли на тип ресурса. Права на чужие ресурсы — отдельные
+# биты, поэтому объединение масок нескольких ролей через OR остается верным
+CAN_CREATE = 1
+CAN_READ = 2
+CAN_UPDATE = 4
+CAN_DELETE = 8
+CAN_UPDATE_OTHERS = 16
+CAN_DELETE_OTHERS = 32
+
+ACTION_BITS = {
+    'create': CAN_CREATE,
+    'read': CAN_READ,
+    'update': CAN_UPDATE,
+    'delete': CAN_DELETE,
+}
+OTHERS_BITS = {
+    'update': CAN_UPDATE_OTHERS,
+    'delete': CAN_DELETE_OTHERS,
+}
+
+# Глобальный счетчик поколений разрешений в общем кэше и счетчик
+# поколений ролей пользователя
+PERMISSIONS_GENERATION_KEY = 'permissions_generation'
+USER_GENERATION_KEY = 'user_permissions_generation_{}'
+USER_ROLES_KEY = 'user_roles_{}'
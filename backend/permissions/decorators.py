@@ -3,7 +3,7 @@ from rest_framework.exceptions import PermissionDenied
 import logging
 
 from permissions.models import ResourceType
-from .utils import get_user_role, can_user_access_resource
+from .utils import get_request_permissions
 
 
 logger = logging.getLogger(__name__)
@@ -16,8 +16,8 @@ def require_admin():
         def wrapper(self, request, *args, **kwargs):
             if not request.user.is_authenticated:
                 raise PermissionDenied("Требуется аутентификация")
-            user_role = get_user_role(request.user)
-            if user_role != 'admin':
+            roles = get_request_permissions(request).roles
+            if 'admin' not in roles:
                 raise PermissionDenied("Требуются права администратора")
 
             return func(self, request, *args, **kwargs)
@@ -33,8 +33,8 @@ def require_admin_or_manager():
             if not request.user.is_authenticated:
                 raise PermissionDenied("Требуется аутентификация")
             
-            user_role = get_user_role(request.user)
-            if user_role not in ['admin', 'manager']:
+            roles = get_request_permissions(request).roles
+            if not {'admin', 'manager'} & set(roles):
                 raise PermissionDenied(
                     "Требуется роль администратора или менеджера"
                 )
@@ -51,8 +51,8 @@ def require_user_or_higher():
             if not request.user.is_authenticated:
                 raise PermissionDenied("Требуется аутентификация")
 
-            user_role = get_user_role(request.user)
-            if user_role not in ['admin', 'manager', 'user']:
+            roles = get_request_permissions(request).roles
+            if not {'admin', 'manager', 'user'} & set(roles):
                 raise PermissionDenied("Требуется роль пользователя или выше")
 
             return func(self, request, *args, **kwargs)
@@ -80,48 +80,51 @@ def require_dynamic_permission(action):
             # Получаем тип ресурса из ViewSet
             resource_type = getattr(self, 'resource_type', None)
             logger.debug(f"Resource type from ViewSet: {resource_type}")
-            
+
+            # Для update/delete тип и владелец берутся из самого объекта;
+            # объект кэшируется view (CachedObjectMixin) и не запрашивается
+            # повторно. Http404 пробрасывается как есть
+            resource_owner = None
+            if action in ['update', 'delete'] and hasattr(self, 'get_object'):
+                obj = self.get_object()
+                resource_owner = getattr(obj, 'owner', None)
+                if not resource_type:
+                    resource_type = getattr(obj, 'resource_type', None)
+
             if not resource_type:
                 # Пытаемся определить из модели
                 if hasattr(self, 'queryset') and self.queryset.model:
-                    # Получаем название модели и ищем соответствующий ResourceType
                     model_name = self.queryset.model._meta.model_name
                     logger.debug(f"Model name: {model_name}")
-                    
-                    if model_name == 'resource':
-                        # Для Resource модели определяем тип из request.data
-                        if action == 'create' and request.data.get('resource_type'):
-                            try:
-                                resource_type_obj = ResourceType.objects.get(
-                                    id=request.data['resource_type']
-                                )
-                                resource_type = resource_type_obj.name
-                                logger.debug(f"Resource type from request.data: {resource_type}")
-                            except ResourceType.DoesNotExist:
-                                logger.error(f"ResourceType with id {request.data['resource_type']} not found")
-                                raise PermissionDenied("Неверный тип ресурса")
-                        else:
-                            # Для других действий пытаемся получить из объекта
-                            resource_type = 'product'  # По умолчанию
-                            logger.debug(f"Using default resource type: {resource_type}")
-                    else:
+
+                    if model_name != 'resource':
                         resource_type = model_name
-                        logger.debug(f"Using model name as resource type: {resource_type}")
+                    elif action == 'create' and request.data.get('resource_type'):
+                        # Для создания Resource тип берется из request.data
+                        try:
+                            resource_type = ResourceType.objects.get(
+                                id=request.data['resource_type']
+                            ).name
+                        except (ResourceType.DoesNotExist, ValueError, TypeError):
+                            logger.error(f"ResourceType with id {request.data['resource_type']} not found")
+                            raise PermissionDenied("Неверный тип ресурса")
+
+            if not resource_type:
+                raise PermissionDenied("Не удалось определить тип ресурса")
 
             logger.debug(f"Final resource type: {resource_type}")
 
-            # Получаем владельца ресурса для проверки доступа
-            resource_owner = None
-            if action in ['update', 'delete'] and hasattr(self, 'get_object'):
-                try:
-                    obj = self.get_object()
-                    if hasattr(obj, 'owner'):
-                        resource_owner = obj.owner
-                except:
-                    pass
-
-            if not can_user_access_resource(
-                request.user, resource_type, action, resource_owner
+            # API-ключ ограничивает права владельца своими scopes
+            scope_allows = getattr(request.auth, 'allows', None)
+            if scope_allows is not None and not scope_allows(
+                resource_type, action
+            ):
+                raise PermissionDenied(
+                    f"API-ключ не дает права {action} для ресурса {resource_type}"
+                )
+
+            if not get_request_permissions(request).can(
+                resource_type, action, resource_owner
             ):
                 raise PermissionDenied(
                     f"Недостаточно прав для {action} ресурса {resource_type}"
@@ -0,0 +1,22 @@
+from rest_framework.filters import BaseFilterBackend
+
+from .utils import get_request_permissions, readable_resources_filter
+
+
+class ResourcePermissionFilter(BaseFilterBackend):
+    """
+    Оставляет в queryset только ресурсы, доступные пользователю на чтение.
+
+    Матрица прав пользователя превращается в одно SQL-условие, поэтому
+    список, поиск и пагинация работают в базе без проверок по объектам.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        user = request.user
+        permissions = (
+            get_request_permissions(request).permissions
+            if user.is_authenticated else None
+        )
+        return queryset.filter(readable_resources_filter(
+            user, permissions, getattr(request.auth, 'allows', None)
+        ))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("permissions", "0005_resourcetype_alter_rolepermission_options_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userrole",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["user", "role"],
+                name="user_roles_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,13 @@
+class CachedObjectMixin:
+    """
+    Кэширует объект get_object на время запроса.
+
+    ViewSet создается заново на каждый запрос, поэтому объект, полученный
+    require_dynamic_permission для проверки владельца, переиспользуется
+    в update/destroy без повторного запроса.
+    """
+
+    def get_object(self):
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()
+        return self._cached_object
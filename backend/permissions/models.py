@@ -1,10 +1,39 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from users.models import CustomUser
 
+from .cache import bump_permissions_generation, bump_user_generation
+
+
+class PermissionQuerySet(models.QuerySet):
+    """
+    QuerySet, сбрасывающий кэш разрешений на массовых операциях.
+
+    update() и bulk_create() не отправляют сигналы (в том числе из действий
+    админки), поэтому поколение разрешений увеличивается здесь.
+    """
+
+    def update(self, **kwargs):
+        updated = super().update(**kwargs)
+        if updated:
+            bump_permissions_generation()
+        return updated
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        if created:
+            bump_permissions_generation()
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        updated = super().bulk_update(objs, fields, *args, **kwargs)
+        if updated:
+            bump_permissions_generation()
+        return updated
+
 User = get_user_model()
 
 
@@ -30,6 +59,8 @@ class ResourceType(models.Model):
         verbose_name='Дата создания'
     )
     
+    objects = PermissionQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Тип ресурса'
         verbose_name_plural = 'Типы ресурсов'
@@ -65,6 +96,8 @@ class Role(models.Model):
         verbose_name='Дата создания'
     )
 
+    objects = PermissionQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Роль'
         verbose_name_plural = 'Роли'
@@ -115,11 +148,20 @@ class UserRole(models.Model):
         verbose_name='Активна'
     )
 
+    objects = PermissionQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Роль пользователя'
         verbose_name_plural = 'Роли пользователей'
         unique_together = ['user', 'role']
         ordering = ['-assigned_at']
+        indexes = [
+            # Активные роли пользователя при загрузке прав
+            models.Index(
+                fields=['user', 'role'], condition=models.Q(is_active=True),
+                name='user_roles_active_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.role.name}"
@@ -148,6 +190,8 @@ class RolePermission(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     
+    objects = PermissionQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Разрешение роли'
         verbose_name_plural = 'Разрешения ролей'
@@ -232,3 +276,21 @@ def create_permissions_for_new_resource(sender, instance, created, **kwargs):
                     'can_manage_others': False
                 }
             )
+
+
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=ResourceType)
+@receiver(post_delete, sender=ResourceType)
+def invalidate_permissions(sender, **kwargs):
+    """Изменение разрешений, ролей или типов ресурсов меняет поколение."""
+    bump_permissions_generation()
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def invalidate_user_roles(sender, instance, **kwargs):
+    """Изменение ролей пользователя меняет поколение пользователя."""
+    bump_user_generation(instance.user_id)
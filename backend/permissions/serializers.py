@@ -1,12 +1,16 @@
 import logging
+from django.conf import settings
 from rest_framework import serializers
+
+from config.serializers import SparseFieldsMixin
+from .constants import ACTION_BITS
 from .models import Role, UserRole, RolePermission, ResourceType
 
 
 logger = logging.getLogger(__name__)
 
 
-class ResourceTypeSerializer(serializers.ModelSerializer):
+class ResourceTypeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для типов ресурсов."""
     
     class Meta:
@@ -18,7 +22,7 @@ class ResourceTypeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class RoleSerializer(serializers.ModelSerializer):
+class RoleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для ролей."""
     
     class Meta:
@@ -46,7 +50,7 @@ class RoleDetailSerializer(RoleSerializer):
         return RolePermissionSerializer(permissions, many=True).data
 
 
-class UserRoleSerializer(serializers.ModelSerializer):
+class UserRoleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для связи пользователей с ролями."""
 
     role_name = serializers.CharField(source='role.name', read_only=True)
@@ -61,7 +65,7 @@ class UserRoleSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'assigned_at']
 
 
-class RolePermissionSerializer(serializers.ModelSerializer):
+class RolePermissionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для разрешений ролей."""
 
     resource_type_name = serializers.CharField(
@@ -109,3 +113,50 @@ class RolePermissionUpdateSerializer(serializers.ModelSerializer):
                 attrs['can_update'] = True
 
         return attrs
+
+
+class PermissionCheckItemSerializer(serializers.Serializer):
+    """Одна проверка: может ли пользователь выполнить действие с ресурсом."""
+
+    resource_type = serializers.CharField(help_text='Название типа ресурса')
+    action = serializers.ChoiceField(choices=list(ACTION_BITS))
+    owner_id = serializers.IntegerField(
+        required=False, allow_null=True, help_text='Id владельца ресурса'
+    )
+
+
+class PermissionCheckSerializer(serializers.Serializer):
+    """Сериализатор для пакетной проверки прав."""
+
+    checks = serializers.ListField(
+        child=PermissionCheckItemSerializer(),
+        allow_empty=False,
+        max_length=settings.PERMISSIONS_CHECK_MAX_ITEMS
+    )
+
+
+class PermissionCheckResultSerializer(serializers.Serializer):
+    """Решения пакетной проверки в порядке запроса."""
+
+    results = serializers.ListField(child=serializers.BooleanField())
+
+
+class ResourcePermissionsSerializer(serializers.Serializer):
+    """Итоговые права на один тип ресурса."""
+
+    create = serializers.BooleanField()
+    read = serializers.BooleanField()
+    update = serializers.BooleanField(help_text='Изменение своих ресурсов')
+    delete = serializers.BooleanField(help_text='Удаление своих ресурсов')
+    update_others = serializers.BooleanField()
+    delete_others = serializers.BooleanField()
+
+
+class EffectivePermissionsSerializer(serializers.Serializer):
+    """Роли и итоговая матрица прав пользователя."""
+
+    roles = serializers.ListField(child=serializers.CharField())
+    permissions = serializers.DictField(
+        child=ResourcePermissionsSerializer(),
+        help_text='Права по названию типа ресурса'
+    )
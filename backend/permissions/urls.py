@@ -4,7 +4,8 @@ from .views import (
     RoleViewSet,
     UserRoleViewSet,
     RolePermissionViewSet,
-    ResourceTypeViewSet
+    ResourceTypeViewSet,
+    EffectivePermissionsViewSet
 )
 
 app_name = 'permissions'
@@ -16,5 +17,11 @@ router.register(r'permissions', RolePermissionViewSet, basename='role-permission
 router.register(r'resource-types', ResourceTypeViewSet, basename='resource-types')
 
 urlpatterns = [
+    path('me/', EffectivePermissionsViewSet.as_view(
+        {'get': 'me'}
+    ), name='permission-me'),
+    path('check/', EffectivePermissionsViewSet.as_view(
+        {'post': 'check'}
+    ), name='permission-check'),
     path('', include(router.urls)),
 ]
@@ -1,41 +1,87 @@
-from django.core.cache import cache
+from typing import NamedTuple
 import logging
 
-from .models import UserRole, RolePermission, ResourceType
+from django.conf import settings
+from django.db.models import Q
+
+from .cache import get_user_cache, permission_matrix, set_user_cache
+from .constants import ACTION_BITS, OTHERS_BITS, ROLE_PRIORITY
+from .models import Role, UserRole, RolePermission, ResourceType
 
 logger = logging.getLogger(__name__)
 
 
-def get_user_role(user):
-    """Получает роль пользователя (самую приоритетную)."""
+class UserPermissions(NamedTuple):
+    """Активные роли пользователя и итоговые маски по типам ресурсов."""
+
+    roles: tuple
+    masks: dict
+
+
+NO_PERMISSIONS = UserPermissions(roles=(), masks={})
+
+
+def role_priority(role_name):
+    """Ключ сортировки ролей: admin > manager > user > остальные по имени."""
+    if role_name in ROLE_PRIORITY:
+        return (ROLE_PRIORITY.index(role_name), role_name)
+    return (len(ROLE_PRIORITY), role_name)
+
+
+def get_user_permissions(user):
+    """
+    Эффективные права пользователя: объединение (OR) масок всех
+    активных ролей по каждому типу ресурса.
+
+    Роли кэшируются, маски берутся из матрицы процесса, поэтому
+    в установившемся режиме проверка не обращается к БД.
+    """
     if not user.is_authenticated:
-        return None
+        return NO_PERMISSIONS
+
+    roles, generations = get_user_cache(user.id)
+    if roles is None:
+        roles = load_user_roles(user)
+        set_user_cache(user.id, roles, generations)
+    return UserPermissions(
+        roles=roles, masks=permission_matrix.masks(roles, generations[0])
+    )
 
-    # Кэшируем роль пользователя на 5 минут
-    cache_key = f'user_role_{user.id}'
-    cached_role = cache.get(cache_key)
 
-    if cached_role is not None:
-        return cached_role
+def load_user_roles(user):
+    """Холодный путь: активные роли пользователя одним запросом."""
+    return load_users_roles([user.id]).get(user.id, ())
 
-    # Получаем самую приоритетную роль пользователя
-    user_role = UserRole.objects.filter(
-        user=user,
-        is_active=True
-    ).select_related('role').order_by('role__name').first()
 
-    if user_role:
-        role_name = user_role.role.name
-        cache.set(cache_key, role_name, 300)  # 5 минут
-        return role_name
+def load_users_roles(user_ids):
+    """
+    Активные роли нескольких пользователей одним запросом.
+
+    Роли упорядочены по приоритету; пользователи без активных ролей
+    в результат не попадают.
+    """
+    rows = UserRole.objects.filter(
+        user_id__in=user_ids, is_active=True
+    ).values_list('user_id', 'role__name')
+
+    roles = {}
+    for user_id, role_name in rows:
+        roles.setdefault(user_id, set()).add(role_name)
+    return {
+        user_id: tuple(sorted(user_roles, key=role_priority))
+        for user_id, user_roles in roles.items()
+    }
 
-    return None
+
+def get_user_role(user):
+    """Получает роль пользователя (самую приоритетную)."""
+    roles = get_user_permissions(user).roles
+    return roles[0] if roles else None
 
 
 def user_has_role(user, role_name):
     """Проверяет, есть ли у пользователя конкретная роль."""
-    user_role = get_user_role(user)
-    return user_role == role_name
+    return role_name in get_user_permissions(user).roles
 
 
 def user_is_admin(user):
@@ -55,64 +101,57 @@ def user_is_user(user):
 
 def get_role_permissions(role_name, resource_type):
     """Получает разрешения роли на конкретный тип ресурса."""
-    
-    # 🔍 ЛОГИРУЕМ поиск разрешений
-    logger.debug(f"=== get_role_permissions DEBUG ===")
-    logger.debug(f"Role name: {role_name}")
-    logger.debug(f"Resource type: {resource_type} (type: {type(resource_type)})")
-    
-    try:
-        # Поддерживаем как строковые названия, так и объекты ResourceType
-        if isinstance(resource_type, str):
-            logger.debug(f"Searching by string resource type: {resource_type}")
-            permission = RolePermission.objects.get(
-                role__name=role_name, 
-                resource_type__name=resource_type,
-                resource_type__is_active=True
-            )
-        else:
-            logger.debug(f"Searching by ResourceType object: {resource_type}")
-            permission = RolePermission.objects.get(
-                role__name=role_name, 
-                resource_type=resource_type,
-                resource_type__is_active=True
-            )
-        
-        logger.debug(f"Found permission: {permission}")
-        return permission
-        
-    except RolePermission.DoesNotExist:
+    resource_filter = (
+        {'resource_type__name': resource_type}
+        if isinstance(resource_type, str)
+        else {'resource_type': resource_type}
+    )
+    permission = RolePermission.objects.select_related(
+        'role', 'resource_type'
+    ).filter(
+        role__name=role_name,
+        resource_type__is_active=True,
+        **resource_filter
+    ).first()
+
+    if permission is None:
         logger.warning(f"RolePermission not found for role '{role_name}' on resource '{resource_type}'")
-        
-        # 🔍 ЛОГИРУЕМ что есть в базе
-        try:
-            role = UserRole.objects.get(role__name=role_name) # Assuming UserRole has a role field
-            logger.debug(f"Role exists: {role}")
-        except UserRole.DoesNotExist:
-            logger.error(f"Role '{role_name}' not found")
-            return None
-            
-        try:
-            if isinstance(resource_type, str):
-                resource = ResourceType.objects.get(name=resource_type)
-            else:
-                resource = resource_type
-            logger.debug(f"Resource type exists: {resource}")
-        except ResourceType.DoesNotExist:
-            logger.error(f"ResourceType '{resource_type}' not found")
-            return None
-            
-        # 🔍 ЛОГИРУЕМ существующие разрешения
-        existing_permissions = RolePermission.objects.filter(
-            role=role, 
-            resource_type=resource
-        )
-        logger.debug(f"Existing permissions for this role/resource: {list(existing_permissions)}")
-        
-        return None
+        if settings.PERMISSIONS_DEBUG:
+            log_permission_diagnostics(role_name, resource_type)
+    return permission
 
 
-def can_user_access_resource(user, resource_type, action, resource_owner=None):
+def log_permission_diagnostics(role_name, resource_type):
+    """
+    Диагностика отсутствующего разрешения: что есть в базе.
+
+    Делает дополнительные запросы, поэтому вызывается только при
+    включенном PERMISSIONS_DEBUG.
+    """
+    role = Role.objects.filter(name=role_name).first()
+    if role is None:
+        logger.error(f"Role '{role_name}' not found")
+        return
+    logger.debug(f"Role exists: {role}")
+
+    if isinstance(resource_type, str):
+        resource = ResourceType.objects.filter(name=resource_type).first()
+    else:
+        resource = resource_type
+    if resource is None:
+        logger.error(f"ResourceType '{resource_type}' not found")
+        return
+    logger.debug(f"Resource type exists: {resource} (active: {resource.is_active})")
+
+    existing_permissions = RolePermission.objects.filter(
+        role=role,
+        resource_type=resource
+    )
+    logger.debug(f"Existing permissions for this role/resource: {list(existing_permissions)}")
+
+
+def can_user_access_resource(user, resource_type, action, resource_owner=None,
+                             permissions=None):
     """
     Проверяет, может ли пользователь выполнить действие с ресурсом.
 
@@ -121,18 +160,17 @@ def can_user_access_resource(user, resource_type, action, resource_owner=None):
         resource_type: Тип ресурса (строка или объект ResourceType)
         action: Действие ('create', 'read', 'update', 'delete')
         resource_owner: Владелец ресурса (для проверки своих/чужих)
+        permissions: Уже полученные права пользователя (UserPermissions)
     """
-    logger = logging.getLogger(__name__)
-    
-    # 🔍 ЛОГИРУЕМ входные параметры
-    logger.debug(f"=== can_user_access_resource DEBUG ===")
-    logger.debug(f"User: {user.email}")
-    logger.debug(f"Resource type: {resource_type}")
-    logger.debug(f"Action: {action}")
-    logger.debug(f"Resource owner: {resource_owner}")
+    debug = settings.PERMISSIONS_DEBUG
+    if debug:
+        logger.debug(f"=== can_user_access_resource DEBUG ===")
+        logger.debug(f"User: {user}")
+        logger.debug(f"Resource type: {resource_type}")
+        logger.debug(f"Action: {action}")
+        logger.debug(f"Resource owner: {resource_owner}")
 
     if not user.is_authenticated:
-        logger.debug("User not authenticated")
         # Гости могут только читать активные ресурсы
         if action == 'read':
             try:
@@ -147,67 +185,178 @@ def can_user_access_resource(user, resource_type, action, resource_owner=None):
                 return False
         return False
 
-    user_role = get_user_role(user)
-    logger.debug(f"User role: {user_role}")
-
-    if not user_role:
+    if permissions is None:
+        permissions = get_user_permissions(user)
+    if not permissions.roles:
         logger.warning(f"User {user.email} has no role assigned")
         return False
 
-    # 🔍 ЛОГИРУЕМ поиск разрешений
-    logger.debug(f"Looking for permissions for role '{user_role}' on resource '{resource_type}'")
-    
-    permission = get_role_permissions(user_role, resource_type)
-    logger.debug(f"Found permission: {permission}")
-    
-    if not permission:
-        logger.warning(f"No permission found for role {user_role} on {resource_type}")
+    # Объединенная маска всех ролей из кэша: без запросов к БД
+    resource_type_name = getattr(resource_type, 'name', resource_type)
+    mask = permissions.masks.get(resource_type_name, 0)
+    if debug:
+        logger.debug(f"User roles: {permissions.roles}")
+        logger.debug(f"Permission mask on '{resource_type_name}': {mask:06b}")
+
+    if not mask:
+        logger.warning(f"No permission found for roles {permissions.roles} on {resource_type}")
+        if debug:
+            for role_name in permissions.roles:
+                log_permission_diagnostics(role_name, resource_type)
         return False
 
-    # 🔍 ЛОГИРУЕМ детали разрешения
-    logger.debug(f"Permission details:")
-    logger.debug(f"  - Role: {permission.role.name}")
-    logger.debug(f"  - Resource type: {permission.resource_type.name}")
-    logger.debug(f"  - Can read: {permission.can_read}")
-    logger.debug(f"  - Can create: {permission.can_create}")
-    logger.debug(f"  - Can update: {permission.can_update}")
-    logger.debug(f"  - Can delete: {permission.can_delete}")
-    logger.debug(f"  - Can manage others: {permission.can_manage_others}")
-
-    # Проверяем действие
-    if action == 'create':
-        result = permission.can_create
-        logger.debug(f"Action 'create' result: {result}")
-        return result
-    elif action == 'read':
-        result = permission.can_read
-        logger.debug(f"Can read: {result}")
-        return result
-    elif action == 'update':
-        if permission.can_manage_others:
-            result = permission.can_update
-            logger.debug(f"Can update (manage others): {result}")
-            return result
-        elif permission.can_update and resource_owner:
-            result = str(user.id) == str(resource_owner.id)
-            logger.debug(f"Can update (own resource): {result}")
-            return result
-        logger.debug("Cannot update: no permission or not own resource")
-        return False
-    elif action == 'delete':
-        if permission.can_manage_others:
-            result = permission.can_delete
-            logger.debug(f"Can delete (manage others): {result}")
-            return result
-        elif permission.can_delete and resource_owner:
-            result = str(user.id) == str(resource_owner.id)
-            result = str(user.id) == str(resource_owner.id)
-            logger.debug(f"Can delete (own resource): {result}")
-            return result
-        logger.debug("Cannot delete: no permission or not own resource")
+    owner_id = resource_owner.id if resource_owner is not None else None
+    return check_mask(mask, action, user.id, owner_id)
+
+
+def check_mask(mask, action, user_id, owner_id=None):
+    """Проверяет действие по маске прав с учетом владельца ресурса."""
+    bit = ACTION_BITS.get(action)
+    if bit is None or not mask & bit:
         return False
+    if action in OTHERS_BITS:
+        if mask & OTHERS_BITS[action]:
+            return True
+        # Без права на чужие ресурсы — только свои
+        return owner_id is not None and str(user_id) == str(owner_id)
+    return True
+
+
+def can_user_access_resources(user, checks, permissions=None,
+                              scope_allows=None):
+    """
+    Пакетная проверка прав по одной матрице пользователя.
+
+    Args:
+        user: Пользователь
+        checks: Список (тип ресурса, действие, id владельца или None)
+        permissions: Уже полученные права пользователя (UserPermissions)
+        scope_allows: Ограничение scopes API-ключа
+
+    Returns:
+        Список решений в порядке checks
+    """
+    names = [getattr(rt, 'name', rt) for rt, _, _ in checks]
+    if not user.is_authenticated:
+        # Гости могут только читать активные ресурсы
+        active = set(ResourceType.objects.filter(
+            name__in=set(names), is_active=True
+        ).values_list('name', flat=True))
+        return [
+            action == 'read' and name in active
+            for name, (_, action, _) in zip(names, checks)
+        ]
+
+    if permissions is None:
+        permissions = get_user_permissions(user)
+    return [
+        (scope_allows is None or scope_allows(name, action))
+        and check_mask(
+            permissions.masks.get(name, 0), action, user.id, owner_id
+        )
+        for name, (_, action, owner_id) in zip(names, checks)
+    ]
 
-    return False
+
+def describe_permissions(permissions):
+    """
+    Итоговая матрица прав для клиента.
+
+    {тип ресурса: {действие: bool, 'update_others': bool,
+    'delete_others': bool}}; действия update/delete без *_others
+    относятся только к своим ресурсам.
+    """
+    return {
+        name: {
+            **{action: bool(mask & bit) for action, bit in ACTION_BITS.items()},
+            **{
+                f'{action}_others': bool(mask & bit)
+                for action, bit in OTHERS_BITS.items()
+            },
+        }
+        for name, mask in sorted(permissions.masks.items())
+    }
+
+
+def readable_resources_filter(user, permissions=None, scope_allows=None):
+    """
+    Q-условие для ресурсов, которые пользователь может читать.
+
+    Типы с правом чтения доступны целиком, типы с другими правами, но без
+    чтения — только в части своих ресурсов. scope_allows дополнительно
+    ограничивает типы scopes API-ключа.
+    """
+    if not user.is_authenticated:
+        # Гости видят только активные ресурсы
+        return Q(resource_type__is_active=True)
+
+    if permissions is None:
+        permissions = get_user_permissions(user)
+    readable, own_only = [], []
+    for name, mask in permissions.masks.items():
+        if scope_allows is not None and not scope_allows(name, 'read'):
+            continue
+        if mask & ACTION_BITS['read']:
+            readable.append(name)
+        elif mask:
+            own_only.append(name)
+    return (
+        Q(resource_type__name__in=readable)
+        | Q(resource_type__name__in=own_only, owner_id=user.id)
+    )
+
+
+class RequestPermissions:
+    """
+    Решения о доступе в пределах одного запроса.
+
+    Права пользователя читаются один раз, каждое решение по
+    (тип ресурса, действие, id владельца) вычисляется один раз и
+    переиспользуется декораторами, сериализаторами и view.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._permissions = None
+        self._decisions = {}
+
+    @property
+    def permissions(self):
+        if self._permissions is None:
+            self._permissions = get_user_permissions(self.user)
+        return self._permissions
+
+    @property
+    def roles(self):
+        return self.permissions.roles
+
+    def can(self, resource_type, action, resource_owner=None):
+        """Мемоизированный can_user_access_resource."""
+        key = (
+            getattr(resource_type, 'name', resource_type),
+            action,
+            resource_owner.id if resource_owner is not None else None,
+        )
+        decision = self._decisions.get(key)
+        if decision is None:
+            decision = can_user_access_resource(
+                self.user, resource_type, action, resource_owner,
+                permissions=(
+                    self.permissions if self.user.is_authenticated else None
+                )
+            )
+            self._decisions[key] = decision
+        return decision
+
+
+def get_request_permissions(request):
+    """Решения о доступе текущего запроса (DRF или Django request)."""
+    http_request = getattr(request, '_request', request)
+    memo = getattr(http_request, 'permission_decisions', None)
+    if memo is None or memo.user is not request.user:
+        memo = RequestPermissions(request.user)
+        http_request.permission_decisions = memo
+    return memo
 
 
 def can_user_manage_roles(user):
@@ -3,31 +3,40 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db import transaction
+from django.utils.http import parse_etags
 from drf_spectacular.utils import extend_schema
 
+from config.mixins import SparseFieldsQuerysetMixin
+from users.permissions import APIKeyScopePermission
 from users.spectacular import CustomJWTAuthenticationScheme
 from .models import Role, UserRole, RolePermission, ResourceType
 from .serializers import (
     RoleSerializer, RoleDetailSerializer, UserRoleSerializer,
     RolePermissionSerializer, RolePermissionDetailSerializer,
-    RolePermissionUpdateSerializer, ResourceTypeSerializer
+    RolePermissionUpdateSerializer, ResourceTypeSerializer,
+    PermissionCheckSerializer, PermissionCheckResultSerializer,
+    EffectivePermissionsSerializer
 )
+from .cache import get_user_generations
 from .decorators import require_admin
+from .utils import (
+    can_user_access_resources, describe_permissions, get_request_permissions
+)
 
 
 logger = logging.getLogger('permissions')
 
 
-class ResourceTypeViewSet(viewsets.ModelViewSet):
+class ResourceTypeViewSet(SparseFieldsQuerysetMixin, viewsets.ModelViewSet):
     """API для управления типами ресурсов."""
 
     queryset = ResourceType.objects.filter(is_active=True)
     serializer_class = ResourceTypeSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, APIKeyScopePermission]
 
     def get_queryset(self):
         """Фильтруем только активные ресурсы."""
-        return ResourceType.objects.filter(is_active=True)
+        return super().get_queryset().filter(is_active=True)
 
     @require_admin()
     def create(self, request, *args, **kwargs):
@@ -86,12 +95,12 @@ class ResourceTypeViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Resource type deactivated'})
 
 
-class RoleViewSet(viewsets.ModelViewSet):
+class RoleViewSet(SparseFieldsQuerysetMixin, viewsets.ModelViewSet):
     """API для управления ролями."""
 
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, APIKeyScopePermission]
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -111,12 +120,12 @@ class RoleViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class UserRoleViewSet(viewsets.ModelViewSet):
+class UserRoleViewSet(SparseFieldsQuerysetMixin, viewsets.ModelViewSet):
     """API для управления ролями пользователей."""
 
     queryset = UserRole.objects.all()
     serializer_class = UserRoleSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, APIKeyScopePermission]
 
     @require_admin()
     def create(self, request, *args, **kwargs):
@@ -131,12 +140,12 @@ class UserRoleViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class RolePermissionViewSet(viewsets.ModelViewSet):
+class RolePermissionViewSet(SparseFieldsQuerysetMixin, viewsets.ModelViewSet):
     """API для управления разрешениями ролей."""
 
     queryset = RolePermission.objects.all()
     serializer_class = RolePermissionSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, APIKeyScopePermission]
 
     def get_serializer_class(self):
         if self.action in ['retrieve', 'list']:
@@ -194,3 +203,72 @@ class RolePermissionViewSet(viewsets.ModelViewSet):
         )
         serializer = self.get_serializer(role_permissions, many=True)
         return Response(serializer.data)
+
+
+class EffectivePermissionsViewSet(viewsets.ViewSet):
+    """API для проверки итоговых прав текущего пользователя."""
+
+    permission_classes = [permissions.IsAuthenticated, APIKeyScopePermission]
+    # Решения check учитывают scopes ключа
+    api_key_actions = ('check',)
+
+    @extend_schema(
+        tags=['permissions'],
+        summary='Мои права',
+        description=(
+            'Роли и итоговая матрица прав текущего пользователя. Ответ '
+            'содержит ETag; при совпадении If-None-Match возвращается 304'
+        ),
+        responses={200: EffectivePermissionsSerializer, 304: None}
+    )
+    @action(detail=False, methods=['get'])
+    def me(self, request):
+        """Итоговые права текущего пользователя."""
+        # ETag — поколения прав пользователя: проверка без чтения матрицы
+        generations = get_user_generations(request.user.id)
+        etag = '"{}-{}-{}"'.format(request.user.id, *generations)
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (
+            if_none_match.strip() == '*'
+            or etag in (
+                tag.removeprefix('W/') for tag in parse_etags(if_none_match)
+            )
+        ):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            user_permissions = get_request_permissions(request).permissions
+            response = Response({
+                'roles': list(user_permissions.roles),
+                'permissions': describe_permissions(user_permissions),
+            })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @extend_schema(
+        tags=['permissions'],
+        summary='Пакетная проверка прав',
+        description=(
+            'Проверяет список (тип ресурса, действие, владелец) и '
+            'возвращает решения в том же порядке'
+        ),
+        request=PermissionCheckSerializer,
+        responses=PermissionCheckResultSerializer
+    )
+    @action(detail=False, methods=['post'])
+    def check(self, request):
+        """Пакетная проверка прав текущего пользователя."""
+        serializer = PermissionCheckSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        checks = [
+            (item['resource_type'], item['action'], item.get('owner_id'))
+            for item in serializer.validated_data['checks']
+        ]
+        decisions = can_user_access_resources(
+            request.user, checks,
+            permissions=get_request_permissions(request).permissions,
+            scope_allows=getattr(request.auth, 'allows', None)
+        )
+        return Response({'results': decisions})
@@ -1,6 +1,7 @@
 from typing import Any
 import uuid
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 from .factories import UserFactory
@@ -9,6 +10,14 @@ from permissions.models import Role, UserRole, ResourceType
 from users.views import UserViewSet
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Очищает кэш между тестами: счетчики входа, снимки пользователей."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def api_client() -> APIClient:
     """API клиент для тестирования."""
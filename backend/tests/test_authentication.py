@@ -0,0 +1,567 @@
+from datetime import timedelta
+from unittest import mock
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+import jwt
+import pytest
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from users.authentication import (
+    APIKeyAuthentication, CustomJWTAuthentication, OpaqueTokenAuthentication,
+    load_user
+)
+from users.introspection import introspect_tokens
+from mock_resources.serializers import ResourceSerializer
+from permissions.cache import permission_matrix
+from permissions.models import ResourceType, RolePermission
+from permissions.utils import get_user_permissions
+from users.models import APIKey, AuthSession, CustomUser
+from users.revocation import REVOCATION_SEQ_KEY, BloomFilter, revoked_tokens
+from users.sessions import (
+    BaseSessionStore, CachedDatabaseSessionStore, hash_session_token
+)
+from users.token_cache import VerifiedTokenCache, token_epoch_key
+from users.views import UserViewSet
+
+
+def make_request(token):
+    """Создает запрос с заголовком авторизации."""
+    return APIRequestFactory().get(
+        '/', HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+
+
+def write_key_pair(directory, kid, private_key):
+    """Сохраняет закрытый и открытый ключи в PEM файлы."""
+    private_path = directory / f'{kid}.key'
+    private_path.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    public_dir = directory / 'public'
+    public_dir.mkdir(exist_ok=True)
+    (public_dir / f'{kid}.pem').write_bytes(
+        private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    return private_path, public_dir
+
+
+class TestVerifiedTokenCache:
+    """Тесты для кэша проверенных токенов."""
+
+    def test_cache_is_bounded(self):
+        """Тест что кэш вытесняет самые старые записи."""
+        token_cache = VerifiedTokenCache(maxsize=2, ttl=60)
+        for key in (b'a', b'b', b'c'):
+            token_cache.set(key, key, expires_at=2**32)
+
+        assert len(token_cache) == 2
+        assert token_cache.get(b'a') is None
+        assert token_cache.get(b'c') == b'c'
+
+    def test_entry_expires_at_token_exp(self):
+        """Тест что запись истекает вместе с токеном."""
+        token_cache = VerifiedTokenCache(maxsize=10, ttl=60)
+        token_cache.set(b'expired', 'value', expires_at=0)
+
+        assert token_cache.get(b'expired') is None
+
+
+class TestBloomFilter:
+    """Тесты для Bloom-фильтра отозванных токенов."""
+
+    def test_added_items_are_always_found(self):
+        """Тест отсутствия ложноотрицательных ответов."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f'jti-{n}' for n in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate_is_bounded(self):
+        """Тест что доля ложноположительных ответов близка к заданной."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for n in range(1000):
+            bloom.add(f'jti-{n}')
+
+        false_positives = sum(
+            f'other-{n}' in bloom for n in range(10000)
+        )
+        assert false_positives < 300
+
+
+class TestCustomJWTAuthentication:
+    """Тесты для CustomJWTAuthentication."""
+
+    @pytest.mark.django_db
+    def test_warm_request_makes_no_queries(
+        self, user, django_assert_num_queries
+    ):
+        """Тест что повторная аутентификация не обращается к БД."""
+        token = UserViewSet()._create_jwt_token(user)
+        authenticator = CustomJWTAuthentication()
+        authenticator.authenticate(make_request(token))
+
+        with django_assert_num_queries(0):
+            cached_user, _ = authenticator.authenticate(make_request(token))
+
+        assert cached_user.pk == user.pk
+        assert cached_user.email == user.email
+
+    @pytest.mark.django_db
+    def test_user_save_invalidates_cache(self, user):
+        """Тест что сохранение пользователя сбрасывает кэш токенов."""
+        token = UserViewSet()._create_jwt_token(user)
+        authenticator = CustomJWTAuthentication()
+        authenticator.authenticate(make_request(token))
+
+        user.soft_delete()
+
+        assert authenticator.authenticate(make_request(token)) is None
+
+    @pytest.mark.django_db
+    def test_revocation_survives_seq_eviction(self, user, user_factory):
+        """Тест что вытеснение счетчика журнала не снимает отзыв."""
+        viewset = UserViewSet()
+        token = viewset._create_jwt_token(user)
+        authenticator = CustomJWTAuthentication()
+        authenticator.revoke(token)
+        cache.delete(REVOCATION_SEQ_KEY)
+
+        # Новый процесс; отзыв другого токена создает счетчик заново
+        revoked_tokens.reset()
+        authenticator.revoke(
+            viewset._create_jwt_token(user_factory.create_user())
+        )
+
+        assert authenticator.authenticate(make_request(token)) is None
+        assert introspect_tokens([token]) == [{'active': False}]
+
+    @pytest.mark.django_db
+    def test_load_user_keeps_newer_epoch(self, user):
+        """Тест что снимок из БД не затирает эпоху, увеличенную отзывом."""
+        token = UserViewSet()._create_jwt_token(user)
+        get_user = CustomUser.objects.get
+
+        def get_then_revoke(*args, **kwargs):
+            # Отзыв всех токенов между чтением из БД и записью в кэш
+            loaded = get_user(*args, **kwargs)
+            user.revoke_all_tokens()
+            return loaded
+
+        with mock.patch.object(
+            CustomUser.objects, 'get', side_effect=get_then_revoke
+        ):
+            _, epoch = load_user(user.id)
+
+        assert epoch == user.token_epoch
+        assert cache.get(token_epoch_key(user.id)) == user.token_epoch
+        assert CustomJWTAuthentication().authenticate(
+            make_request(token)
+        ) is None
+
+
+class TestAsymmetricSigning:
+    """Тесты для асимметричной подписи JWT."""
+
+    @pytest.fixture
+    def rsa_settings(self, settings, tmp_path):
+        """Настройки RS256 с предыдущим ключом для ротации."""
+        old_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        new_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        write_key_pair(tmp_path, 'old', old_key)
+        private_path, public_dir = write_key_pair(tmp_path, 'new', new_key)
+
+        settings.JWT_ALGORITHM = 'RS256'
+        settings.JWT_SIGNING_KEY_ID = 'new'
+        settings.JWT_PRIVATE_KEY_FILE = str(private_path)
+        settings.JWT_PUBLIC_KEYS_DIR = str(public_dir)
+        return old_key
+
+    @pytest.mark.django_db
+    def test_rs256_token_has_kid_and_authenticates(self, rsa_settings, user):
+        """Тест что токен подписан RS256 с kid и проходит проверку."""
+        token = UserViewSet()._create_jwt_token(user)
+
+        header = jwt.get_unverified_header(token)
+        assert header['alg'] == 'RS256'
+        assert header['kid'] == 'new'
+
+        authenticated_user, _ = CustomJWTAuthentication().authenticate(
+            make_request(token)
+        )
+        assert authenticated_user.pk == user.pk
+
+    @pytest.mark.django_db
+    def test_token_signed_with_rotated_key_is_accepted(self, rsa_settings, user):
+        """Тест что токен, подписанный предыдущим ключом, еще действует."""
+        token = jwt.encode(
+            {'user_id': user.id, 'epoch': user.token_epoch},
+            rsa_settings, algorithm='RS256', headers={'kid': 'old'}
+        )
+
+        result = CustomJWTAuthentication().authenticate(make_request(token))
+
+        assert result is not None
+
+    @pytest.mark.django_db
+    def test_jwks_endpoint_publishes_all_keys(self, rsa_settings, api_client):
+        """Тест что JWKS содержит все действующие ключи."""
+        response = api_client.get(reverse('users:user-jwks'))
+
+        assert response.status_code == status.HTTP_200_OK
+        kids = {key['kid'] for key in response.data['keys']}
+        assert kids == {'old', 'new'}
+        assert all(key['kty'] == 'RSA' for key in response.data['keys'])
+
+    @pytest.mark.django_db
+    def test_eddsa_signing(self, settings, tmp_path, user):
+        """Тест подписи EdDSA."""
+        private_path, public_dir = write_key_pair(
+            tmp_path, 'ed', ed25519.Ed25519PrivateKey.generate()
+        )
+        settings.JWT_ALGORITHM = 'EdDSA'
+        settings.JWT_SIGNING_KEY_ID = 'ed'
+        settings.JWT_PRIVATE_KEY_FILE = str(private_path)
+        settings.JWT_PUBLIC_KEYS_DIR = str(public_dir)
+
+        token = UserViewSet()._create_jwt_token(user)
+
+        assert jwt.get_unverified_header(token)['alg'] == 'EdDSA'
+        assert CustomJWTAuthentication().authenticate(
+            make_request(token)
+        ) is not None
+
+
+class TestOpaqueTokens:
+    """Тесты для opaque-токенов."""
+
+    @pytest.fixture
+    def opaque_settings(self, settings):
+        """Включает выдачу opaque-токенов."""
+        settings.AUTH_TOKEN_TYPE = 'opaque'
+
+    @pytest.mark.django_db
+    def test_login_issues_opaque_token(self, opaque_settings, api_client, user):
+        """Тест что вход выдает opaque-токен, принимаемый API."""
+        response = api_client.post(reverse('users:user-login'), {
+            'email': user.email, 'password': 'TestPass123!'
+        })
+        token = response.data['token']
+        assert token.startswith('ot_')
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = api_client.get(reverse('users:user-me'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['email'] == user.email
+
+    @pytest.mark.django_db
+    def test_logout_revokes_session(self, opaque_settings, api_client, user):
+        """Тест что выход удаляет сессию."""
+        token = api_client.post(reverse('users:user-login'), {
+            'email': user.email, 'password': 'TestPass123!'
+        }).data['token']
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        api_client.post(reverse('users:user-logout'))
+
+        response = api_client.get(reverse('users:user-me'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert not AuthSession.objects.exists()
+
+    @pytest.mark.django_db
+    def test_session_survives_cache_loss(self, user):
+        """Тест что сессия восстанавливается из БД при потере кэша."""
+        store = CachedDatabaseSessionStore(lifetime=60)
+        token = store.create(user)
+        cache.delete(store.cache_key(hash_session_token(token)))
+
+        assert store.get(token) == (user.id, user.token_epoch)
+
+    @pytest.mark.django_db
+    def test_sliding_expiry_reaches_database(self, user):
+        """Тест что продление в кэше переносится в БД после половины срока."""
+        store = CachedDatabaseSessionStore(lifetime=60)
+        token = store.create(user)
+        token_hash = hash_session_token(token)
+        created = timezone.now()
+
+        with mock.patch(
+            'users.sessions.timezone.now',
+            return_value=created + timedelta(seconds=40)
+        ):
+            assert store.get(token) == (user.id, user.token_epoch)
+        assert AuthSession.objects.get(
+            token_hash=token_hash
+        ).expires_at >= created + timedelta(seconds=100)
+
+        # Сессия активна дольше lifetime и переживает потерю кэша
+        cache.delete(store.cache_key(token_hash))
+        with mock.patch(
+            'users.sessions.timezone.now',
+            return_value=created + timedelta(seconds=90)
+        ):
+            assert store.get(token) == (user.id, user.token_epoch)
+
+    @pytest.mark.django_db
+    def test_revoke_all_tokens_invalidates_sessions(self, user):
+        """Тест что смена эпохи отзывает opaque-токены."""
+        token = CachedDatabaseSessionStore().create(user)
+        authenticator = OpaqueTokenAuthentication()
+        assert authenticator.authenticate(make_request(token)) is not None
+
+        user.revoke_all_tokens()
+
+        assert authenticator.authenticate(make_request(token)) is None
+
+    def test_incomplete_store_fails_on_creation(self):
+        """Тест что хранилище без load_many нельзя создать."""
+        class IncompleteSessionStore(BaseSessionStore):
+            def save(self, token_hash, session):
+                pass
+
+            def load(self, token_hash):
+                return None
+
+            def delete(self, token_hash):
+                pass
+
+        with pytest.raises(TypeError):
+            IncompleteSessionStore(lifetime=60)
+
+
+class TestTokenIntrospection:
+    """Тесты для пакетной проверки токенов."""
+
+    @pytest.mark.django_db
+    def test_introspect_batch(self, admin_client, user_factory):
+        """Тест что пакет проверяется с отзывом, эпохой и ролью."""
+        users = [user_factory.create_user() for _ in range(3)]
+        viewset = UserViewSet()
+        tokens = [viewset._create_jwt_token(user) for user in users]
+        CustomJWTAuthentication().revoke(tokens[1])
+        users[2].revoke_all_tokens()
+
+        response = admin_client.post(
+            reverse('users:user-introspect'),
+            {'tokens': tokens + ['garbage']},
+            format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert results[0]['active'] is True
+        assert results[0]['user_id'] == users[0].id
+        assert results[0]['role'] == 'user'
+        assert results[0]['exp'] == jwt.decode(
+            tokens[0], options={'verify_signature': False}
+        )['exp']
+        assert [result['active'] for result in results[1:]] == [
+            False, False, False
+        ]
+
+    @pytest.mark.django_db
+    def test_cold_batch_makes_two_queries(
+        self, user_factory, django_assert_num_queries
+    ):
+        """Тест что пакет без кэша — два запроса, права попадают в кэш."""
+        users = [user_factory.create_user() for _ in range(5)]
+        tokens = [UserViewSet()._create_jwt_token(user) for user in users]
+        cache.clear()
+
+        with django_assert_num_queries(2):
+            results = introspect_tokens(tokens)
+
+        assert all(result['active'] for result in results)
+        assert {result['role'] for result in results} == {'user'}
+        permission_matrix.get()
+        with django_assert_num_queries(0):
+            introspect_tokens(tokens)
+            assert get_user_permissions(users[0]).roles == ('user',)
+
+    @pytest.mark.django_db
+    def test_opaque_batch_reads_sessions_once(
+        self, user_factory, django_assert_num_queries
+    ):
+        """Тест что сессии пакета читаются одним запросом без продления."""
+        users = [user_factory.create_user() for _ in range(3)]
+        store = CachedDatabaseSessionStore()
+        tokens = [store.create(user) for user in users]
+        expires_at = dict(
+            AuthSession.objects.values_list('token_hash', 'expires_at')
+        )
+        cache.clear()
+
+        # Сессии, пользователи и их права
+        with django_assert_num_queries(3):
+            results = introspect_tokens(tokens + ['ot_unknown'])
+
+        assert [result['active'] for result in results] == [
+            True, True, True, False
+        ]
+        assert dict(
+            AuthSession.objects.values_list('token_hash', 'expires_at')
+        ) == expires_at
+        assert not cache.get(store.cache_key(hash_session_token(tokens[0])))
+
+    @pytest.mark.django_db
+    def test_introspect_requires_admin(self, authenticated_client):
+        """Тест что обычный пользователь не может проверять токены."""
+        response = authenticated_client.post(
+            reverse('users:user-introspect'), {'tokens': ['x']}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestAPIKeyAuthentication:
+    """Тесты для аутентификации по API-ключу."""
+
+    @pytest.fixture
+    def product_type(self, user):
+        """Тип ресурса, который роль user может создавать."""
+        product = ResourceType.objects.create(name='product')
+        RolePermission.objects.filter(
+            role__name='user', resource_type=product
+        ).update(can_create=True)
+        return product
+
+    @pytest.mark.django_db
+    def test_warm_key_makes_no_queries(self, user, django_assert_num_queries):
+        """Тест что повторная проверка ключа не обращается к БД."""
+        _, key = APIKey.objects.issue(user, 'gateway', {})
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Api-Key {key}'
+        )
+        authenticator = APIKeyAuthentication()
+        authenticator.authenticate(request)
+
+        with django_assert_num_queries(0):
+            authenticated_user, api_key = authenticator.authenticate(request)
+
+        assert authenticated_user.pk == user.pk
+        assert api_key.name == 'gateway'
+
+    @pytest.mark.django_db
+    def test_wrong_secret_and_deactivated_key(self, api_client, user):
+        """Тест что ключ с чужим секретом и отключенный ключ отклоняются."""
+        api_key, key = APIKey.objects.issue(user, 'gateway', {})
+        url = reverse('resources:resource-my-resources')
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Api-Key {key}x')
+        assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Api-Key {key}')
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+
+        api_key.is_active = False
+        api_key.save()
+        assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.django_db
+    def test_scopes_limit_role_permissions(
+        self, api_client, user, product_type
+    ):
+        """Тест что ключ не дает больше прав, чем указано в scopes."""
+        url = reverse('resources:resource-list')
+        data = {'name': 'Товар', 'resource_type': product_type.id}
+
+        _, read_key = APIKey.objects.issue(user, 'reader', {'product': ['read']})
+        api_client.credentials(HTTP_AUTHORIZATION=f'Api-Key {read_key}')
+        assert api_client.post(url, data).status_code == status.HTTP_403_FORBIDDEN
+
+        _, write_key = APIKey.objects.issue(
+            user, 'writer', {'product': ['read', 'create']}
+        )
+        api_client.credentials(HTTP_AUTHORIZATION=f'Api-Key {write_key}')
+        assert api_client.post(url, data).status_code == status.HTTP_201_CREATED
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('url_name, method', [
+        ('users:user-me', 'get'),
+        ('users:user-profile', 'patch'),
+        ('users:user-change-password', 'post'),
+        ('users:user-logout-all', 'post'),
+        ('users:user-delete-account', 'post'),
+        ('permissions:permission-me', 'get'),
+    ])
+    def test_key_denied_on_user_endpoints(
+        self, api_client, user, product_type, url_name, method
+    ):
+        """Тест что ключ не дает доступа к управлению аккаунтом."""
+        _, key = APIKey.objects.issue(
+            user, 'gateway', {'product': ['read', 'create']}
+        )
+        api_client.credentials(HTTP_AUTHORIZATION=f'Api-Key {key}')
+
+        response = getattr(api_client, method)(reverse(url_name), {})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        user.refresh_from_db()
+        assert user.is_active
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('url_name, method', [
+        ('users:user-list', 'get'),
+        ('users:user-introspect', 'post'),
+        ('permissions:role-list', 'post'),
+        ('permissions:user-role-list', 'get'),
+        ('permissions:role-permission-list', 'get'),
+        ('permissions:resource-types-list', 'post'),
+    ])
+    def test_admin_key_denied_on_admin_endpoints(
+        self, api_client, admin_user, url_name, method
+    ):
+        """Тест что ключ администратора не дает прав администратора."""
+        _, key = APIKey.objects.issue(admin_user, 'gateway', {})
+        api_client.credentials(HTTP_AUTHORIZATION=f'Api-Key {key}')
+
+        response = getattr(api_client, method)(
+            reverse(url_name), {'name': 'from_key'}
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    @pytest.mark.django_db
+    def test_available_types_respect_scopes(
+        self, api_client, user, product_type
+    ):
+        """Тест что доступные для создания типы ограничены scopes."""
+        url = reverse('resources:resource-available-types')
+
+        _, read_key = APIKey.objects.issue(user, 'reader', {'product': ['read']})
+        api_client.credentials(HTTP_AUTHORIZATION=f'Api-Key {read_key}')
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == []
+
+        _, write_key = APIKey.objects.issue(
+            user, 'writer', {'product': ['create']}
+        )
+        api_client.credentials(HTTP_AUTHORIZATION=f'Api-Key {write_key}')
+        response = api_client.get(url)
+        assert [item['name'] for item in response.data] == ['product']
+
+    @pytest.mark.django_db
+    def test_serializer_checks_scopes(self, user, product_type):
+        """Тест что сериализатор ресурса проверяет scopes ключа."""
+        api_key = APIKey(user=user, scopes={'product': ['read']})
+        request = APIRequestFactory().post('/')
+        request.user, request.auth = user, api_key
+        serializer = ResourceSerializer(
+            data={'name': 'Товар', 'resource_type': product_type.id},
+            context={'request': request}
+        )
+
+        assert not serializer.is_valid()
+        assert 'non_field_errors' in serializer.errors
@@ -3,7 +3,7 @@ import pytest
 from rest_framework import status
 from faker import Faker
 
-from permissions.models import Role, UserRole, ResourceType
+from permissions.models import Role, UserRole, ResourceType, RolePermission
 from .base import BaseAPITestCase
 
 fake = Faker('ru_RU')
@@ -287,3 +287,102 @@ class TestPermissionsAPI(BaseAPITestCase):
         # Проверяем что ресурс деактивирован
         resource_type.refresh_from_db()
         assert resource_type.is_active is False
+
+
+class TestPermissionCheck(BaseAPITestCase):
+    """Тесты для пакетной проверки прав."""
+
+    @pytest.mark.django_db
+    def test_check_returns_decision_vector(
+        self, authenticated_client, user, user_factory
+    ):
+        """Тест что решения возвращаются в порядке запроса."""
+        document_type = ResourceType.objects.create(name='document')
+        RolePermission.objects.filter(
+            role__name='user', resource_type=document_type
+        ).update(can_read=True, can_update=True, can_manage_others=False)
+        other = user_factory.create_user()
+
+        response = authenticated_client.post(
+            self.get_url('permissions:permission-check'),
+            {'checks': [
+                {'resource_type': 'document', 'action': 'read'},
+                {'resource_type': 'document', 'action': 'update',
+                 'owner_id': user.id},
+                {'resource_type': 'document', 'action': 'update',
+                 'owner_id': other.id},
+                {'resource_type': 'document', 'action': 'delete',
+                 'owner_id': user.id},
+                {'resource_type': 'missing', 'action': 'read'},
+            ]},
+            format='json'
+        )
+
+        self.assert_response_success(response)
+        assert response.data['results'] == [True, True, False, False, False]
+
+    @pytest.mark.django_db
+    def test_check_rejects_unknown_action(self, authenticated_client):
+        """Тест что неизвестное действие отклоняется."""
+        response = authenticated_client.post(
+            self.get_url('permissions:permission-check'),
+            {'checks': [{'resource_type': 'document', 'action': 'publish'}]},
+            format='json'
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db
+    def test_check_requires_authentication(self, api_client):
+        """Тест что гость не может проверять права."""
+        response = api_client.post(
+            self.get_url('permissions:permission-check'),
+            {'checks': [{'resource_type': 'document', 'action': 'read'}]},
+            format='json'
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestMyPermissions(BaseAPITestCase):
+    """Тесты для итоговых прав текущего пользователя."""
+
+    @pytest.mark.django_db
+    def test_me_returns_effective_matrix(self, authenticated_client):
+        """Тест что возвращается матрица с разделением свои/чужие."""
+        document_type = ResourceType.objects.create(name='document')
+        RolePermission.objects.filter(
+            role__name='user', resource_type=document_type
+        ).update(can_read=True, can_update=True, can_manage_others=False)
+
+        response = authenticated_client.get(
+            self.get_url('permissions:permission-me')
+        )
+
+        self.assert_response_success(response)
+        assert response['ETag']
+        assert response.data['roles'] == ['user']
+        assert response.data['permissions']['document'] == {
+            'create': False, 'read': True, 'update': True, 'delete': False,
+            'update_others': False, 'delete_others': False,
+        }
+
+    @pytest.mark.django_db
+    def test_me_revalidation(self, authenticated_client, user):
+        """Тест что совпавший ETag дает 304, а смена ролей — новый ETag."""
+        url = self.get_url('permissions:permission-me')
+        etag = authenticated_client.get(url)['ETag']
+
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+
+        UserRole.objects.create(
+            user=user, role=Role.objects.create(name='auditor')
+        )
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assert_response_success(response)
+        assert response['ETag'] != etag
+        assert 'auditor' in response.data['roles']
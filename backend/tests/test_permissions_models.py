@@ -1,9 +1,24 @@
+from unittest import mock
+
 import pytest
+from django.core.cache import cache
+from django.db import transaction
 from faker import Faker
 
+from permissions.admin import ResourceTypeAdmin
+from permissions.cache import (
+    get_user_generations, permission_matrix, set_user_cache
+)
+from permissions.constants import (
+    CAN_CREATE, CAN_DELETE, CAN_READ, CAN_UPDATE
+)
 from permissions.models import (
     Role, UserRole, RolePermission, ResourceType
 )
+from permissions import utils
+from permissions.utils import (
+    can_user_access_resource, get_user_permissions, get_user_role
+)
 
 fake = Faker('ru_RU')
 
@@ -246,3 +261,201 @@ class TestResourceTypeModel:
         )
 
         assert str(resource_type) == 'product'
+
+
+class TestPermissionMatrix:
+    """Тесты для скомпилированной матрицы разрешений."""
+
+    @pytest.mark.django_db
+    def test_steady_state_makes_no_queries(self, django_assert_num_queries):
+        """Тест что проверка по актуальной матрице не обращается к БД."""
+        role = Role.objects.create(name='test_role')
+        ResourceType.objects.create(name='test_resource')
+        permission_matrix.mask('test_role', 'test_resource')
+
+        with django_assert_num_queries(0):
+            mask = permission_matrix.mask(role.name, 'test_resource')
+
+        assert mask == CAN_READ
+
+    @pytest.mark.django_db
+    def test_matrix_rebuilt_after_change(self):
+        """Тест что изменение разрешения перестраивает матрицу."""
+        role = Role.objects.create(name='test_role')
+        resource_type = ResourceType.objects.create(name='test_resource')
+        assert permission_matrix.mask('test_role', 'test_resource') == CAN_READ
+
+        permission = RolePermission.objects.get(
+            role=role, resource_type=resource_type
+        )
+        permission.can_create = True
+        permission.can_update = True
+        permission.save()
+
+        assert permission_matrix.mask('test_role', 'test_resource') == (
+            CAN_CREATE | CAN_READ | CAN_UPDATE
+        )
+
+        resource_type.is_active = False
+        resource_type.save()
+
+        assert permission_matrix.mask('test_role', 'test_resource') == 0
+
+
+class TestPermissionCacheInvalidation:
+    """Тесты сброса кэша разрешений по поколениям."""
+
+    @pytest.mark.django_db
+    def test_user_role_change_invalidates_cached_role(self, user):
+        """Тест что изменение UserRole сразу меняет роль из кэша."""
+        assert get_user_role(user) == 'user'
+
+        manager_role = Role.objects.create(name='manager')
+        UserRole.objects.create(user=user, role=manager_role)
+        assert get_user_role(user) == 'manager'
+
+        UserRole.objects.filter(user=user, role=manager_role).update(
+            is_active=False
+        )
+        assert get_user_role(user) == 'user'
+
+    @pytest.mark.django_db
+    def test_cached_role_makes_no_queries(
+        self, user, django_assert_num_queries
+    ):
+        """Тест что роль из кэша не требует запросов."""
+        get_user_role(user)
+
+        with django_assert_num_queries(0):
+            assert get_user_role(user) == 'user'
+
+    @pytest.mark.django_db
+    def test_role_rename_by_bulk_update(self, user):
+        """Тест что переименование роли через update() видно сразу."""
+        assert get_user_role(user) == 'user'
+
+        Role.objects.filter(name='user').update(name='customer')
+
+        assert get_user_role(user) == 'customer'
+
+    @pytest.mark.django_db
+    def test_admin_bulk_action_invalidates_permissions(self, rf, user):
+        """Тест что действие админки без сигналов сбрасывает кэш прав."""
+        resource_type = ResourceType.objects.create(name='test_resource')
+        assert can_user_access_resource(user, 'test_resource', 'read')
+
+        model_admin = ResourceTypeAdmin(ResourceType, None)
+        model_admin.message_user = lambda *args, **kwargs: None
+        model_admin.deactivate_resources(
+            rf.get('/'), ResourceType.objects.filter(pk=resource_type.pk)
+        )
+
+        assert not can_user_access_resource(user, 'test_resource', 'read')
+
+
+    @pytest.mark.django_db
+    def test_concurrent_read_inside_atomic_is_invalidated(
+        self, user, django_capture_on_commit_callbacks
+    ):
+        """Тест что запись, закэшированная до фиксации, устаревает."""
+        manager_role = Role.objects.create(name='manager')
+        stale_roles = get_user_permissions(user).roles
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                UserRole.objects.create(user=user, role=manager_role)
+                # Параллельный запрос: новое поколение, старые строки
+                set_user_cache(
+                    user.id, stale_roles, get_user_generations(user.id)
+                )
+
+        assert get_user_role(user) == 'manager'
+
+
+class TestEffectivePermissions:
+    """Тесты для объединения прав нескольких ролей."""
+
+    @pytest.mark.django_db
+    def test_masks_of_all_roles_are_combined(self, user):
+        """Тест что права всех активных ролей объединяются."""
+        resource_type = ResourceType.objects.create(name='test_resource')
+        writer = Role.objects.create(name='writer')
+        RolePermission.objects.filter(
+            role=writer, resource_type=resource_type
+        ).update(can_create=True)
+        cleaner = Role.objects.create(name='cleaner')
+        RolePermission.objects.filter(
+            role=cleaner, resource_type=resource_type
+        ).update(can_delete=True)
+        UserRole.objects.create(user=user, role=writer)
+        UserRole.objects.create(user=user, role=cleaner)
+
+        permissions = get_user_permissions(user)
+
+        assert set(permissions.roles) == {'user', 'writer', 'cleaner'}
+        assert permissions.masks['test_resource'] == (
+            CAN_CREATE | CAN_READ | CAN_DELETE
+        )
+        assert can_user_access_resource(user, resource_type, 'create')
+        assert can_user_access_resource(user, resource_type, 'delete', user)
+
+    @pytest.mark.django_db
+    def test_role_priority_is_not_alphabetical(self, user):
+        """Тест что основная роль выбирается по приоритету, а не по имени."""
+        UserRole.objects.create(
+            user=user, role=Role.objects.create(name='auditor')
+        )
+        assert get_user_role(user) == 'user'
+
+        UserRole.objects.create(
+            user=user, role=Role.objects.create(name='admin')
+        )
+        assert get_user_role(user) == 'admin'
+
+    @pytest.mark.django_db
+    def test_cold_path_is_single_query(self, user, django_assert_num_queries):
+        """Тест что права без кэша загружаются одним запросом."""
+        resource_type = ResourceType.objects.create(name='test_resource')
+        cache.clear()
+        permission_matrix.get()
+
+        with django_assert_num_queries(1):
+            assert can_user_access_resource(user, resource_type, 'read')
+
+    @pytest.mark.django_db
+    def test_missing_permission_without_diagnostics(
+        self, user, django_assert_num_queries
+    ):
+        """Тест что без PERMISSIONS_DEBUG отказ не делает лишних запросов."""
+        get_user_permissions(user)
+
+        with django_assert_num_queries(0):
+            assert not can_user_access_resource(user, 'missing', 'read')
+
+
+class TestRequestPermissions:
+    """Тесты для решений о доступе в пределах запроса."""
+
+    @pytest.mark.django_db
+    def test_create_computes_decision_once(self, role_user_client):
+        """Тест что декораторы и сериализатор используют одно решение."""
+        resource_type = ResourceType.objects.create(name='test_resource')
+        RolePermission.objects.filter(
+            role__name='user', resource_type=resource_type
+        ).update(can_create=True)
+
+        with mock.patch.object(
+            utils, 'get_user_permissions', wraps=get_user_permissions
+        ) as permissions_spy, mock.patch.object(
+            utils, 'can_user_access_resource',
+            wraps=can_user_access_resource
+        ) as decision_spy:
+            response = role_user_client.post(
+                '/api/v1/resources/resources/',
+                {'name': 'Ресурс', 'resource_type': resource_type.id},
+                format='json'
+            )
+
+        assert response.status_code == 201
+        assert permissions_spy.call_count == 1
+        assert decision_spy.call_count == 1
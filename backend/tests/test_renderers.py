@@ -0,0 +1,47 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from config.renderers import ORJSONParser, ORJSONRenderer
+
+
+class TestORJSONRenderer:
+    """Тесты для рендерера и парсера на orjson."""
+
+    def test_matches_standard_renderer(self):
+        """Тест что вывод совпадает со стандартным JSONRenderer."""
+        data = {
+            'id': uuid.uuid4(),
+            'name': gettext_lazy('Ресурс'),
+            'price': decimal.Decimal('10.50'),
+            'date': datetime.date(2026, 1, 2),
+            'count': {1: 'один'},
+        }
+
+        rendered = ORJSONRenderer().render(data, 'application/json')
+
+        assert json.loads(rendered) == json.loads(
+            JSONRenderer().render(data, 'application/json')
+        )
+
+    def test_utc_datetime_uses_z_suffix(self):
+        """Тест что время в UTC кодируется с суффиксом Z, как в DRF."""
+        value = datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+
+        assert ORJSONRenderer().render({'at': value}) == (
+            b'{"at":"2026-01-02T03:04:05Z"}'
+        )
+
+    def test_parser_rejects_invalid_json(self):
+        """Тест что невалидный JSON дает ParseError."""
+        assert ORJSONParser().parse(io.BytesIO(b'{"a": 1}')) == {'a': 1}
+
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"a":'))
@@ -0,0 +1,364 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from config.pagination import KeysetPagination
+from mock_resources.models import Resource
+from mock_resources.serializers import (
+    ResourceListSerializer, ResourceSerializer
+)
+from mock_resources.views import ResourceViewSet
+from permissions.models import ResourceType, RolePermission
+
+
+@pytest.fixture
+def document_type():
+    """Тип ресурса, где роль 'user' управляет только своими ресурсами."""
+    resource_type = ResourceType.objects.create(name='document')
+    RolePermission.objects.filter(
+        role__name='user', resource_type=resource_type
+    ).update(
+        can_create=True, can_read=True, can_update=True, can_delete=True,
+        can_manage_others=False
+    )
+    return resource_type
+
+
+def detail_url(resource):
+    return f'/api/v1/resources/resources/{resource.id}/'
+
+
+class TestResourceWrites:
+    """Тесты для проверки прав на изменение ресурсов."""
+
+    @pytest.mark.django_db
+    def test_update_uses_object_resource_type(
+        self, authenticated_client, user, document_type
+    ):
+        """Тест что права проверяются по типу самого ресурса."""
+        resource = Resource.objects.create(
+            name='Договор', resource_type=document_type, owner=user
+        )
+
+        response = authenticated_client.patch(
+            detail_url(resource), {'name': 'Новый договор'}, format='json'
+        )
+
+        assert response.status_code == 200
+        resource.refresh_from_db()
+        assert resource.name == 'Новый договор'
+
+    @pytest.mark.django_db
+    def test_update_fetches_object_once(
+        self, authenticated_client, user, document_type
+    ):
+        """Тест что объект запрашивается один раз на декоратор и view."""
+        resource = Resource.objects.create(
+            name='Договор', resource_type=document_type, owner=user
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_client.patch(
+                detail_url(resource), {'name': 'Новый договор'},
+                format='json'
+            )
+
+        assert response.status_code == 200
+        table = Resource._meta.db_table
+        selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}"' in query['sql']
+        ]
+        assert len(selects) == 1
+
+    @pytest.mark.django_db
+    def test_delete_foreign_resource_denied(
+        self, authenticated_client, user_factory, document_type
+    ):
+        """Тест что без права на чужие ресурсы удаление запрещено."""
+        resource = Resource.objects.create(
+            name='Чужой договор', resource_type=document_type,
+            owner=user_factory.create_user()
+        )
+
+        response = authenticated_client.delete(detail_url(resource))
+
+        assert response.status_code == 403
+        assert Resource.objects.filter(id=resource.id).exists()
+
+    @pytest.mark.django_db
+    def test_missing_resource_returns_404(self, authenticated_client):
+        """Тест что несуществующий ресурс дает 404, а не 403."""
+        response = authenticated_client.delete(
+            '/api/v1/resources/resources/999999/'
+        )
+
+        assert response.status_code == 404
+
+
+class TestResourceListFiltering:
+    """Тесты для фильтрации списков ресурсов по правам."""
+
+    list_url = '/api/v1/resources/resources/'
+
+    @pytest.fixture
+    def resources(self, user, user_factory, document_type):
+        """Свои и чужие ресурсы трех типов с разными правами роли 'user'."""
+        other = user_factory.create_user()
+        note_type = ResourceType.objects.create(name='note')
+        RolePermission.objects.filter(
+            role__name='user', resource_type=note_type
+        ).update(can_read=True)
+        secret_type = ResourceType.objects.create(name='secret')
+        RolePermission.objects.filter(
+            role__name='user', resource_type=secret_type
+        ).update(can_read=False)
+        # document без права чтения: видны только свои ресурсы
+        RolePermission.objects.filter(
+            role__name='user', resource_type=document_type
+        ).update(can_read=False)
+
+        created = {}
+        for resource_type in (document_type, note_type, secret_type):
+            for owner in (user, other):
+                resource = Resource.objects.create(
+                    name=f'{resource_type.name} {owner.email}',
+                    resource_type=resource_type, owner=owner
+                )
+                created[resource_type.name, owner == user] = resource
+        return created
+
+    @staticmethod
+    def ids(response):
+        return {item['id'] for item in response.data['results']}
+
+    @pytest.mark.django_db
+    def test_list_returns_only_authorized_rows(
+        self, authenticated_client, resources
+    ):
+        """Тест что список содержит читаемые типы и свои ресурсы."""
+        response = authenticated_client.get(self.list_url)
+
+        assert response.status_code == 200
+        assert self.ids(response) == {
+            resources['document', True].id,
+            resources['note', True].id,
+            resources['note', False].id,
+        }
+
+    @pytest.mark.django_db
+    def test_search_is_filtered(self, authenticated_client, resources):
+        """Тест что поиск не возвращает недоступные ресурсы."""
+        response = authenticated_client.get(
+            self.list_url, {'search': 'secret'}
+        )
+
+        assert response.status_code == 200
+        assert self.ids(response) == set()
+
+    @pytest.mark.django_db
+    def test_my_resources_is_filtered(self, authenticated_client, resources):
+        """Тест что свои ресурсы без прав на тип не попадают в выдачу."""
+        response = authenticated_client.get(
+            f'{self.list_url}my_resources/'
+        )
+
+        assert response.status_code == 200
+        assert self.ids(response) == {
+            resources['document', True].id,
+            resources['note', True].id,
+        }
+
+    @pytest.mark.django_db
+    def test_unreadable_resource_is_not_found(
+        self, authenticated_client, resources
+    ):
+        """Тест что чужой ресурс без права чтения недоступен по id."""
+        resource = resources['secret', False]
+
+        response = authenticated_client.get(detail_url(resource))
+
+        assert response.status_code == 404
+
+
+class TestKeysetPagination:
+    """Тесты для пагинации ресурсов по курсору."""
+
+    list_url = '/api/v1/resources/resources/'
+
+    @pytest.fixture(autouse=True)
+    def keyset_pagination(self):
+        with mock.patch.object(
+            ResourceViewSet, 'pagination_class', KeysetPagination
+        ):
+            yield
+
+    @pytest.fixture
+    def resources(self, user, document_type):
+        """25 ресурсов с одинаковым created_at: порядок решает id."""
+        created = [
+            Resource.objects.create(
+                name=f'Ресурс {n}', resource_type=document_type, owner=user
+            )
+            for n in range(25)
+        ]
+        Resource.objects.update(created_at=timezone.now())
+        return sorted(created, key=lambda resource: -resource.id)
+
+    @pytest.mark.django_db
+    def test_pages_follow_created_at_and_id(
+        self, authenticated_client, resources
+    ):
+        """Тест что страницы по курсору не теряют и не повторяют строки."""
+        seen = []
+        url = self.list_url
+        while url:
+            response = authenticated_client.get(url)
+            assert response.status_code == 200
+            assert 'count' not in response.data
+            seen += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+
+        assert seen == [resource.id for resource in resources]
+
+    @pytest.mark.django_db
+    def test_previous_link_returns_previous_page(
+        self, authenticated_client, resources
+    ):
+        """Тест что ссылка previous возвращает предыдущую страницу."""
+        first = authenticated_client.get(self.list_url)
+        second = authenticated_client.get(first.data['next'])
+
+        response = authenticated_client.get(second.data['previous'])
+
+        assert response.data['results'] == first.data['results']
+        assert response.data['previous'] is None
+        assert response.data['next'] == first.data['next']
+
+    @pytest.mark.django_db
+    def test_tampered_cursor_rejected(self, authenticated_client, resources):
+        """Тест что подделанный курсор отклоняется."""
+        response = authenticated_client.get(
+            self.list_url, {'cursor': 'W1siMjAyNiJdLDBd:forged'}
+        )
+
+        assert response.status_code == 404
+
+    @pytest.mark.django_db
+    @override_settings(API_PAGINATION_APPROXIMATE_COUNT=True)
+    def test_approximate_count(self, authenticated_client, resources):
+        """Тест что общее число записей добавляется по настройке."""
+        response = authenticated_client.get(self.list_url)
+
+        assert response.data['count'] == 25
+
+
+class TestResourceListSerializer:
+    """Тесты для быстрого сериализатора списков."""
+
+    @pytest.mark.django_db
+    def test_matches_model_serializer(self, user, document_type):
+        """Тест что ответ совпадает с ResourceSerializer."""
+        Resource.objects.create(
+            name='Свой', resource_type=document_type, owner=user
+        )
+        Resource.objects.create(name='Без владельца', resource_type=document_type)
+        queryset = Resource.objects.order_by('id')
+
+        fast = ResourceListSerializer(
+            ResourceListSerializer.get_values(queryset), many=True
+        ).data
+        expected = ResourceSerializer(
+            queryset.select_related('resource_type', 'owner'), many=True
+        ).data
+
+        assert fast == expected
+        assert 'owner_email' not in fast[1]
+
+    @pytest.mark.django_db
+    def test_list_is_single_select(
+        self, authenticated_client, user, document_type,
+        django_assert_num_queries
+    ):
+        """Тест что страница списка читается одним запросом с COUNT."""
+        for n in range(5):
+            Resource.objects.create(
+                name=f'Ресурс {n}', resource_type=document_type, owner=user
+            )
+        authenticated_client.get('/api/v1/resources/resources/')
+
+        with django_assert_num_queries(2):
+            response = authenticated_client.get('/api/v1/resources/resources/')
+
+        assert response.status_code == 200
+        assert len(response.data['results']) == 5
+
+
+class TestSparseFieldsets:
+    """Тесты для выбора полей ответа ?fields= и ?omit=."""
+
+    list_url = '/api/v1/resources/resources/'
+
+    @pytest.fixture
+    def resource(self, user, document_type):
+        return Resource.objects.create(
+            name='Договор', resource_type=document_type, owner=user
+        )
+
+    @staticmethod
+    def selects(context):
+        table = Resource._meta.db_table
+        return [
+            query['sql'] for query in context.captured_queries
+            if f'FROM "{table}"' in query['sql']
+        ]
+
+    @pytest.mark.django_db
+    def test_list_fields(self, authenticated_client, resource):
+        """Тест что список содержит только запрошенные поля и колонки."""
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_client.get(
+                self.list_url, {'fields': 'id,name'}
+            )
+
+        assert response.status_code == 200
+        assert response.data['results'] == [
+            {'id': resource.id, 'name': 'Договор'}
+        ]
+        select = self.selects(context)[-1]
+        assert '"users"' not in select
+        assert '"created_at"' not in select.split(' FROM ')[0]
+
+    @pytest.mark.django_db
+    def test_retrieve_omit(self, authenticated_client, resource):
+        """Тест что ?omit= убирает поля и JOIN владельца."""
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_client.get(
+                detail_url(resource), {'omit': 'owner,owner_email'}
+            )
+
+        assert response.status_code == 200
+        assert set(response.data) == {
+            'id', 'name', 'resource_type', 'resource_type_name',
+            'created_at', 'updated_at'
+        }
+        assert all('"users"' not in sql for sql in self.selects(context))
+
+    @pytest.mark.django_db
+    def test_user_and_role_serializers(self, admin_client):
+        """Тест что ?fields= работает для пользователей и ролей."""
+        response = admin_client.get(
+            '/api/v1/users/profile/me/', {'fields': 'id,email'}
+        )
+        assert set(response.data) == {'id', 'email'}
+
+        response = admin_client.get(
+            '/api/v1/permissions/roles/', {'omit': 'description,created_at'}
+        )
+        assert response.status_code == 200
+        assert set(response.data['results'][0]) == {'id', 'name', 'is_default'}
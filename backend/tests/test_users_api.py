@@ -1,6 +1,7 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.test import APIClient
 from faker import Faker
 
 from users.models import CustomUser
@@ -121,6 +122,133 @@ class TestUserLogin:
         assert 'Неверные учетные данные или аккаунт неактивен' in response.data['error']
 
 
+class TestLoginThrottle:
+    """Тесты для ограничения попыток входа."""
+
+    @pytest.mark.django_db
+    def test_email_limit_rejects_before_lookup(
+        self, api_client, settings, django_assert_num_queries
+    ):
+        """Тест что сверх лимита по email вход отклоняется без запросов к БД."""
+        settings.AUTH_LOGIN_THROTTLE_RATES = {
+            'email': '2/min', 'ip': '100/min', 'global': '1000/min'
+        }
+        url = reverse('users:user-login')
+        login_data = {'email': 'victim@test.com', 'password': 'WrongPass123!'}
+        for _ in range(2):
+            api_client.post(url, login_data)
+
+        with django_assert_num_queries(0):
+            response = api_client.post(url, login_data)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 'Retry-After' in response
+
+        # Другой email с того же IP не заблокирован
+        response = api_client.post(url, {
+            'email': 'other@test.com', 'password': 'WrongPass123!'
+        })
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('body', [[], 'email', 42])
+    def test_non_object_body(self, api_client, body):
+        """Тест что тело не-объект отклоняется с 400, а не падает."""
+        response = api_client.post(
+            reverse('users:user-login'), body, format='json'
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db
+    def test_ip_limit(self, api_client, settings):
+        """Тест лимита попыток с одного IP."""
+        settings.AUTH_LOGIN_THROTTLE_RATES = {
+            'email': '100/min', 'ip': '3/min', 'global': '1000/min'
+        }
+        url = reverse('users:user-login')
+        statuses = [
+            api_client.post(url, {
+                'email': f'user{n}@test.com', 'password': 'WrongPass123!'
+            }).status_code
+            for n in range(4)
+        ]
+
+        assert statuses[-1] == status.HTTP_429_TOO_MANY_REQUESTS
+        assert status.HTTP_429_TOO_MANY_REQUESTS not in statuses[:3]
+
+    @pytest.mark.django_db
+    def test_counters_endpoint(self, api_client, admin_client):
+        """Тест что админ видит счетчики попыток по ключам."""
+        APIClient().post(reverse('users:user-login'), {
+            'email': 'Victim@test.com', 'password': 'WrongPass123!'
+        })
+
+        response = admin_client.get(
+            reverse('users:user-login-throttle'),
+            {'email': 'victim@test.com', 'ip': '127.0.0.1'}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['email']['count'] == 1
+        assert response.data['ip']['count'] == 1
+        assert response.data['global']['count'] >= 1
+
+
+class TestTokenRefresh:
+    """Тесты для ротации refresh-токенов."""
+
+    def login(self, api_client, user):
+        """Выполняет вход и возвращает ответ."""
+        return api_client.post(reverse('users:user-login'), {
+            'email': user.email,
+            'password': 'TestPass123!'
+        })
+
+    @pytest.mark.django_db
+    def test_refresh_rotates_token(self, api_client, user):
+        """Тест что refresh выдает новую пару токенов."""
+        refresh = self.login(api_client, user).data['refresh']
+
+        response = api_client.post(
+            reverse('users:user-refresh'), {'refresh': refresh}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['refresh'] != refresh
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {response.data['token']}"
+        )
+        assert api_client.get(reverse('users:user-me')).status_code == (
+            status.HTTP_200_OK
+        )
+
+    @pytest.mark.django_db
+    def test_refresh_reuse_revokes_family(self, api_client, user):
+        """Тест что повторное использование refresh отзывает цепочку."""
+        url = reverse('users:user-refresh')
+        refresh = self.login(api_client, user).data['refresh']
+        rotated = api_client.post(url, {'refresh': refresh}).data['refresh']
+
+        response = api_client.post(url, {'refresh': refresh})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = api_client.post(url, {'refresh': rotated})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.django_db
+    def test_refresh_invalid_after_password_change(self, api_client, user):
+        """Тест что смена эпохи делает refresh недействительным."""
+        refresh = self.login(api_client, user).data['refresh']
+        user.revoke_all_tokens()
+
+        response = api_client.post(
+            reverse('users:user-refresh'), {'refresh': refresh}
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 class TestUserLogout:
     """Тесты для выхода пользователей."""
 
@@ -133,6 +261,47 @@ class TestUserLogout:
         assert response.status_code == status.HTTP_200_OK
         assert response.data['message'] == 'Успешный выход из системы'
 
+    @pytest.mark.django_db
+    def test_logged_out_token_is_rejected(self, authenticated_client):
+        """Тест что токен после выхода больше не принимается."""
+        authenticated_client.post(reverse('users:user-logout'))
+
+        response = authenticated_client.get(reverse('users:user-me'))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.django_db
+    def test_logout_all_revokes_every_token(self, api_client, user):
+        """Тест что выход со всех устройств отзывает все токены."""
+        login_data = {'email': user.email, 'password': 'TestPass123!'}
+        url = reverse('users:user-login')
+        first_token = api_client.post(url, login_data).data['token']
+        second_token = api_client.post(url, login_data).data['token']
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {first_token}')
+        response = api_client.post(reverse('users:user-logout-all'))
+        assert response.status_code == status.HTTP_200_OK
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {second_token}')
+        response = api_client.get(reverse('users:user-me'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.django_db
+    def test_logout_with_list_body(self, api_client, user):
+        """Тест что выход с телом-списком не падает и отзывает токен."""
+        token = api_client.post(reverse('users:user-login'), {
+            'email': user.email, 'password': 'TestPass123!'
+        }).data['token']
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        response = api_client.post(
+            reverse('users:user-logout'), [1, 2], format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        response = api_client.get(reverse('users:user-me'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
     @pytest.mark.django_db
     def test_user_logout_unauthenticated(self, api_client):
         """Тест выхода неаутентифицированного пользователя."""
@@ -194,6 +363,23 @@ class TestUserProfile:
         user.refresh_from_db()  # Обновляем объект из базы
         assert user.check_password(new_password)
 
+        # Старый токен отозван, новый токен из ответа действует
+        new_token = response.data['token']
+        refresh = response.data['refresh']
+        profile_url = reverse('users:user-me')
+        response = authenticated_client.get(profile_url)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {new_token}')
+        response = authenticated_client.get(profile_url)
+        assert response.status_code == status.HTTP_200_OK
+
+        # Новый refresh-токен действует, несмотря на смену эпохи
+        response = authenticated_client.post(
+            reverse('users:user-refresh'), {'refresh': refresh}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
     @pytest.mark.django_db
     def test_change_password_wrong_old_password(self, authenticated_client):
         """Тест смены пароля с неверным старым паролем."""
@@ -1,7 +1,20 @@
+import asyncio
+from io import StringIO
+import threading
+
+import bcrypt
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.db import IntegrityError
+from django.urls import reverse
+from django.utils import timezone
 from faker import Faker
+from rest_framework import status
+
+from users.hashers import HasherBusy, HasherPool
+from users.models import AuthSession, RefreshToken
+from users.sessions import DatabaseSessionStore
 
 
 User = get_user_model()
@@ -111,3 +124,80 @@ class TestCustomUserModel:
         with pytest.raises(IntegrityError):
             user_factory.create_user(email=user1.email)
         user1.delete()
+
+
+class TestHasherPool:
+    """Тесты для пула хеширования паролей."""
+
+    def test_sync_and_async_api(self):
+        """Тест синхронной и асинхронной проверки пароля."""
+        pool = HasherPool(workers=2, max_pending=4, timeout=5)
+        hashed = pool.hashpw(b'secret', bcrypt.gensalt(4))
+
+        assert pool.checkpw(b'secret', hashed)
+        assert asyncio.run(pool.acheckpw(b'secret', hashed))
+        assert not asyncio.run(pool.acheckpw(b'wrong', hashed))
+        assert pool.pending == 0
+        pool.shutdown()
+
+    def test_saturated_pool_rejects_immediately(self):
+        """Тест что при заполненной очереди задача сразу отклоняется."""
+        pool = HasherPool(workers=1, max_pending=1, timeout=5)
+        release = threading.Event()
+        pool._submit(release.wait)
+
+        with pytest.raises(HasherBusy):
+            pool.hashpw(b'secret', bcrypt.gensalt(4))
+
+        release.set()
+        pool.shutdown()
+
+    @pytest.mark.django_db
+    def test_login_returns_503_when_saturated(self, api_client, user, settings):
+        """Тест что вход при насыщенном пуле получает 503."""
+        settings.AUTH_HASHER_MAX_PENDING = 0
+
+        response = api_client.post(reverse('users:user-login'), {
+            'email': user.email, 'password': 'TestPass123!'
+        })
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '1'
+
+    @pytest.mark.django_db
+    def test_password_rehashed_when_rounds_change(self, user, settings):
+        """Тест пересчета хеша при входе после смены стоимости."""
+        settings.AUTH_BCRYPT_ROUNDS = 5
+
+        assert user.check_password('TestPass123!')
+
+        user.refresh_from_db()
+        assert user.password.startswith('$2b$05$')
+        assert user.check_password('TestPass123!')
+        assert not user.check_password('wrong')
+
+
+class TestPurgeExpiredTokens:
+    """Тесты для очистки истекших токенов."""
+
+    @pytest.mark.django_db
+    def test_only_expired_rows_are_deleted(self, user):
+        """Тест что удаляются только истекшие токены и сессии."""
+        RefreshToken.objects.issue(user)
+        RefreshToken.objects.issue(user)
+        store = DatabaseSessionStore(lifetime=60)
+        store.create(user)
+        store.create(user)
+        past = timezone.now() - timezone.timedelta(seconds=1)
+        RefreshToken.objects.filter(
+            pk=RefreshToken.objects.first().pk
+        ).update(expires_at=past)
+        AuthSession.objects.filter(
+            pk=AuthSession.objects.first().pk
+        ).update(expires_at=past)
+
+        call_command('purge_expired_tokens', batch_size=1, stdout=StringIO())
+
+        assert RefreshToken.objects.count() == 1
+        assert AuthSession.objects.count() == 1
+        assert not RefreshToken.objects.filter(expires_at__lte=past).exists()
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth import get_user_model
 
+from .models import APIKey
+
 User = get_user_model()
 
 
@@ -38,3 +40,16 @@ class CustomUserAdmin(UserAdmin):
     )
 
     readonly_fields = ['deleted_at']
+
+
+@admin.register(APIKey)
+class APIKeyAdmin(admin.ModelAdmin):
+    """Админка для API-ключей. Ключи выпускаются командой create_api_key."""
+
+    list_display = ['name', 'prefix', 'user', 'is_active', 'expires_at']
+    list_filter = ['is_active']
+    search_fields = ['name', 'prefix', 'user__email']
+    readonly_fields = ['prefix', 'key_hash', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
@@ -1,9 +1,103 @@
+import hmac
+import time
+
 from django.conf import settings
 from django.core.cache import cache
 from rest_framework import authentication
 import jwt
 
-from .models import CustomUser
+from .jwt_keys import decode_jwt
+from .models import APIKey, CustomUser, hash_api_key, parse_api_key
+from .revocation import revoked_tokens
+from .sessions import get_session_store, is_opaque_token
+from .token_cache import (
+    token_digest, token_epoch_key, user_snapshot_key, verified_api_keys,
+    verified_tokens
+)
+
+
+def snapshot_user(user):
+    """Легкий снимок пользователя: значения всех колонок модели."""
+    return tuple(
+        getattr(user, field.attname)
+        for field in CustomUser._meta.concrete_fields
+    )
+
+
+def restore_user(snapshot, using='default'):
+    """Восстанавливает пользователя из снимка без запроса к БД."""
+    return CustomUser.from_db(using, None, snapshot)
+
+
+def get_token_id(payload, token):
+    """Идентификатор токена для отзыва.
+
+    Для токенов, выпущенных до появления jti, используется дайджест токена.
+    """
+    return payload.get('jti') or token_digest(token).hex()
+
+
+def decode_token(token):
+    """Проверяет подпись и срок действия токена, возвращает claims."""
+    cached = verified_tokens.get(token_digest(token))
+    if cached is not None:
+        return cached[0]
+    return decode_jwt(token)
+
+
+def cache_token_epoch(user_id, epoch):
+    """
+    Кладет прочитанную из БД эпоху в кэш без срока хранения.
+
+    Уже записанная эпоха не перезаписывается: если revoke_all_tokens
+    увеличил ее после чтения из БД, возвращается новое значение.
+    """
+    key = token_epoch_key(user_id)
+    if cache.add(key, epoch, timeout=None):
+        return epoch
+    return cache.get(key, epoch)
+
+
+def get_token_epoch(user_id):
+    """Текущая эпоха токенов: из кэша, при промахе из БД."""
+    epoch = cache.get(token_epoch_key(user_id))
+    if epoch is None:
+        epoch = CustomUser.objects.filter(id=user_id).values_list(
+            'token_epoch', flat=True
+        ).first()
+        if epoch is not None:
+            epoch = cache_token_epoch(user_id, epoch)
+    return epoch
+
+
+def load_user(user_id):
+    """Пользователь и эпоха одним multi-get, при промахе из БД."""
+    epoch_key = token_epoch_key(user_id)
+    snapshot_key = user_snapshot_key(user_id)
+    found = cache.get_many([epoch_key, snapshot_key])
+    epoch = found.get(epoch_key)
+    user_snapshot = found.get(snapshot_key)
+
+    if user_snapshot is not None:
+        user = restore_user(user_snapshot)
+        if not user.is_active:
+            return None, None
+        if epoch is None:
+            epoch = get_token_epoch(user_id)
+        return user, epoch
+
+    try:
+        user = CustomUser.objects.get(id=user_id, is_active=True)
+    except CustomUser.DoesNotExist:
+        return None, None
+
+    cache.set(
+        snapshot_key, snapshot_user(user),
+        timeout=settings.AUTH_USER_SNAPSHOT_TIMEOUT
+    )
+    if epoch is None:
+        epoch = cache_token_epoch(user_id, user.token_epoch)
+    return user, epoch
 
 
 class CustomJWTAuthentication(authentication.BaseAuthentication):
@@ -16,23 +110,142 @@ class CustomJWTAuthentication(authentication.BaseAuthentication):
             return None
 
         token = auth_header.split(' ')[1]
+        if is_opaque_token(token):
+            return None
+
+        # Повторные запросы с тем же токеном обслуживаются из кэша процесса
+        digest = token_digest(token)
+        cached = verified_tokens.get(digest)
+        if cached is not None:
+            payload, user_snapshot = cached
+        else:
+            try:
+                # Декодируем JWT токен
+                payload = decode_jwt(token)
+            except (jwt.InvalidTokenError, jwt.ExpiredSignatureError):
+                return None
 
         # Проверяем, не отозван ли токен
-        if cache.get(f'revoked_token_{token}'):
+        if revoked_tokens.is_revoked(get_token_id(payload, token)):
+            return None
+
+        user_id = payload.get('user_id')
+        if not user_id:
+            return None
+
+        if cached is not None:
+            user = restore_user(user_snapshot)
+            current_epoch = get_token_epoch(user_id)
+        else:
+            user, current_epoch = load_user(user_id)
+            if user is None:
+                return None
+            verified_tokens.set(
+                digest,
+                (payload, snapshot_user(user)),
+                expires_at=payload.get(
+                    'exp', time.time() + verified_tokens.ttl
+                ),
+                user_id=user.id,
+            )
+
+        # Токены, выпущенные до смены эпохи, отозваны
+        if payload.get('epoch', 0) != current_epoch:
+            return None
+
+        return (user, token)
+
+    def authenticate_header(self, request):
+        return 'Bearer'
+
+    def revoke(self, token):
+        """Отзывает токен до конца срока его действия."""
+        payload = decode_token(token)
+        revoked_tokens.revoke(get_token_id(payload, token), payload['exp'])
+
+
+class OpaqueTokenAuthentication(authentication.BaseAuthentication):
+    """Аутентификация по opaque-токенам из хранилища сессий."""
+
+    def authenticate(self, request):
+        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+
+        if not auth_header.startswith('Bearer '):
             return None
 
-        try:
-            # Декодируем JWT токен
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            user_id = payload.get('user_id')
+        token = auth_header.split(' ')[1]
+        if not is_opaque_token(token):
+            return None
 
-            if user_id:
-                user = CustomUser.objects.get(id=user_id, is_active=True)
-                return (user, token)
-        except (jwt.InvalidTokenError, jwt.ExpiredSignatureError, CustomUser.DoesNotExist):
-            pass
+        session = get_session_store().get(token)
+        if session is None:
+            return None
+
+        user_id, token_epoch = session
+        user, current_epoch = load_user(user_id)
+        if user is None or token_epoch != current_epoch:
+            return None
 
-        return None
+        return (user, token)
 
     def authenticate_header(self, request):
         return 'Bearer'
+
+    def revoke(self, token):
+        """Отзывает сессию."""
+        get_session_store().revoke(token)
+
+
+class APIKeyAuthentication(authentication.BaseAuthentication):
+    """
+    Аутентификация сервисных клиентов по API-ключу.
+
+    Заголовок: Authorization: Api-Key <ключ>. Ключ ищется по индексированному
+    префиксу и сверяется по SHA-256, без bcrypt и без разбора JWT. Проверенные
+    ключи кэшируются в памяти процесса на AUTH_API_KEY_CACHE_TTL секунд.
+    request.auth — объект APIKey, его scopes ограничивают права владельца.
+    """
+
+    keyword = 'Api-Key'
+
+    def authenticate(self, request):
+        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+
+        if not auth_header.startswith(f'{self.keyword} '):
+            return None
+
+        key = auth_header.split(' ')[1]
+        prefix = parse_api_key(key)
+        if prefix is None:
+            return None
+
+        digest = token_digest(key)
+        cached = verified_api_keys.get(digest)
+        if cached is not None:
+            user_snapshot, api_key = cached
+            if api_key.is_expired:
+                return None
+            return (restore_user(user_snapshot), api_key)
+
+        api_key = APIKey.objects.select_related('user').filter(
+            prefix=prefix, is_active=True
+        ).first()
+        if api_key is None or api_key.is_expired:
+            return None
+        if not hmac.compare_digest(api_key.key_hash, hash_api_key(key)):
+            return None
+
+        user = api_key.user
+        if not user.is_active:
+            return None
+
+        verified_api_keys.set(
+            digest,
+            (snapshot_user(user), api_key),
+            expires_at=time.time() + verified_api_keys.ttl,
+            user_id=user.id,
+        )
+        return (user, api_key)
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,148 @@
+"""
+Пул для хеширования паролей bcrypt.
+
+bcrypt отпускает GIL, поэтому хеши считаются в ограниченном пуле потоков
+(или процессов, AUTH_HASHER_POOL), а не в потоке запроса. Число задач
+в работе и в очереди ограничено: при насыщении пула запрос сразу получает
+503 вместо ожидания, и шквал логинов не занимает все воркеры.
+"""
+import asyncio
+import threading
+from concurrent.futures import (
+    ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+)
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import status
+from rest_framework.exceptions import APIException
+import bcrypt
+
+
+class HasherBusy(APIException):
+    """Пул хеширования насыщен."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Сервис перегружен, повторите попытку позже.'
+    default_code = 'hasher_busy'
+    wait = 1
+
+
+def bcrypt_rounds(hashed):
+    """Стоимость (cost) из хеша вида $2b$12$..., None для чужого формата."""
+    try:
+        return int(hashed.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def _hashpw(password, salt):
+    return bcrypt.hashpw(password, salt)
+
+
+def _checkpw(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+class HasherPool:
+    """Ограниченный пул для bcrypt с синхронным и асинхронным API."""
+
+    def __init__(self, workers, max_pending, timeout, kind='thread'):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.kind = kind
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        """Число задач в работе и в очереди."""
+        return self._pending
+
+    def hashpw(self, password, salt):
+        """Хеширует пароль в пуле."""
+        return self._wait(self._submit(_hashpw, password, salt))
+
+    def checkpw(self, password, hashed):
+        """Сверяет пароль с хешем в пуле."""
+        return self._wait(self._submit(_checkpw, password, hashed))
+
+    async def ahashpw(self, password, salt):
+        """Асинхронный вариант hashpw для ASGI."""
+        return await self._await(self._submit(_hashpw, password, salt))
+
+    async def acheckpw(self, password, hashed):
+        """Асинхронный вариант checkpw для ASGI."""
+        return await self._await(self._submit(_checkpw, password, hashed))
+
+    def shutdown(self):
+        """Останавливает пул, следующий вызов создаст новый."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HasherBusy()
+            if self._executor is None:
+                self._executor = self._create_executor()
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _wait(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise HasherBusy()
+
+    async def _await(self, future):
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise HasherBusy()
+
+    def _create_executor(self):
+        if self.kind == 'process':
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='bcrypt'
+        )
+
+
+def _create_pool():
+    return HasherPool(
+        workers=settings.AUTH_HASHER_WORKERS,
+        max_pending=settings.AUTH_HASHER_MAX_PENDING,
+        timeout=settings.AUTH_HASHER_TIMEOUT,
+        kind=settings.AUTH_HASHER_POOL,
+    )
+
+
+hasher_pool = _create_pool()
+
+
+@receiver(setting_changed)
+def reset_hasher_pool(setting, **kwargs):
+    """Пересоздает пул при изменении настроек (в тестах)."""
+    global hasher_pool
+    if setting.startswith('AUTH_HASHER_'):
+        hasher_pool.shutdown()
+        hasher_pool = _create_pool()
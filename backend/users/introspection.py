@@ -0,0 +1,140 @@
+"""
+Пакетная проверка токенов для шлюза.
+
+Для всего пакета выполняется один multi-get к общему кэшу (отзыв, снимки
+пользователей, эпохи и роли) и для промахов кэша не больше двух
+запросов: пользователи по id__in и их роли.
+"""
+from django.conf import settings
+from django.core.cache import cache
+import jwt
+
+from permissions.cache import get_user_cache, user_cache_entry, user_cache_keys
+from permissions.constants import USER_ROLES_CACHE_TIMEOUT
+from permissions.utils import load_users_roles
+
+from .authentication import (
+    cache_token_epoch, decode_token, get_token_id, restore_user,
+    snapshot_user
+)
+from .models import CustomUser
+from .revocation import REVOKED_JTI_KEY, revoked_tokens
+from .sessions import get_session_store, is_opaque_token
+from .token_cache import token_epoch_key, user_snapshot_key
+
+INACTIVE = {'active': False}
+
+
+def _parse(token, sessions):
+    """
+    Возвращает (user_id, epoch, exp, jti) или None для невалидного токена.
+
+    sessions — сессии opaque-токенов пакета, прочитанные заранее.
+    """
+    if is_opaque_token(token):
+        session = sessions.get(token)
+        if session is None:
+            return None
+        user_id, epoch = session
+        return user_id, epoch, None, None
+
+    try:
+        payload = decode_token(token)
+    except jwt.InvalidTokenError:
+        return None
+    user_id = payload.get('user_id')
+    if not user_id:
+        return None
+    return (
+        user_id, payload.get('epoch', 0), payload.get('exp'),
+        get_token_id(payload, token)
+    )
+
+
+def _load_users(generations):
+    """
+    Пользователи с промахом кэша и их роли двумя запросами.
+
+    generations — {id пользователя: поколения прав}, прочитанные до БД.
+    Снимки, эпохи и роли кладутся в кэш; основная роль пользователя
+    записывается в атрибут role_name.
+    """
+    users = CustomUser.objects.filter(id__in=list(generations), is_active=True)
+    loaded = {user.id: user for user in users}
+    roles = load_users_roles(list(loaded))
+
+    snapshots = {}
+    entries = {}
+    for user in loaded.values():
+        user_roles = roles.get(user.id, ())
+        user.role_name = user_roles[0] if user_roles else None
+        snapshots[user_snapshot_key(user.id)] = snapshot_user(user)
+        key, entry = user_cache_entry(
+            user.id, user_roles, generations[user.id]
+        )
+        entries[key] = entry
+    cache.set_many(snapshots, timeout=settings.AUTH_USER_SNAPSHOT_TIMEOUT)
+    cache.set_many(entries, timeout=USER_ROLES_CACHE_TIMEOUT)
+    for user in loaded.values():
+        user.token_epoch = cache_token_epoch(user.id, user.token_epoch)
+    return loaded
+
+
+def introspect_tokens(tokens):
+    """
+    Проверяет пакет токенов.
+
+    Возвращает список в порядке tokens: для действующего токена
+    {'active': True, 'user_id', 'role', 'exp'}, иначе {'active': False}.
+    """
+    # Сессии opaque-токенов читаются пакетом и не продлеваются
+    opaque = [token for token in tokens if is_opaque_token(token)]
+    sessions = get_session_store().get_many(opaque) if opaque else {}
+    parsed = [_parse(token, sessions) for token in tokens]
+    valid = [item for item in parsed if item is not None]
+    user_ids = {item[0] for item in valid}
+
+    # Отзыв проверяется в кэше только для jti, прошедших Bloom-фильтр
+    suspects = revoked_tokens.candidates(
+        [item[3] for item in valid if item[3] is not None]
+    )
+    keys = [REVOKED_JTI_KEY.format(jti) for jti in suspects]
+    for user_id in user_ids:
+        keys += [user_snapshot_key(user_id), token_epoch_key(user_id)]
+        keys += user_cache_keys(user_id)
+    found = cache.get_many(keys)
+
+    revoked = {jti for jti in suspects if found.get(REVOKED_JTI_KEY.format(jti))}
+    states = {}
+    missing = {}
+    for user_id in user_ids:
+        user_snapshot = found.get(user_snapshot_key(user_id))
+        epoch = found.get(token_epoch_key(user_id))
+        roles, generations = get_user_cache(user_id, found)
+        if user_snapshot is None or epoch is None or roles is None:
+            missing[user_id] = generations
+            continue
+        if restore_user(user_snapshot).is_active:
+            states[user_id] = (epoch, roles[0] if roles else None)
+
+    if missing:
+        for user_id, user in _load_users(missing).items():
+            states[user_id] = (user.token_epoch, user.role_name)
+
+    results = []
+    for item in parsed:
+        if item is None:
+            results.append(INACTIVE)
+            continue
+        user_id, epoch, exp, jti = item
+        state = states.get(user_id)
+        if state is None or jti in revoked or state[0] != epoch:
+            results.append(INACTIVE)
+            continue
+        results.append({
+            'active': True,
+            'user_id': user_id,
+            'role': state[1],
+            'exp': exp,
+        })
+    return results
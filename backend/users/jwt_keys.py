@@ -0,0 +1,157 @@
+"""
+Ключи подписи JWT.
+
+Поддерживает симметричный режим HS256 с SECRET_KEY и асимметричные
+RS256/EdDSA с заголовком kid. В асимметричном режиме открытые ключи
+публикуются через JWKS, и другие сервисы проверяют токены локально.
+Для ротации в JWT_PUBLIC_KEYS_DIR кладутся открытые ключи <kid>.pem всех
+еще действующих ключей подписи. Ключи разбираются один раз на процесс.
+"""
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+import jwt
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+ASYMMETRIC_ALGORITHMS = ('RS256', 'EdDSA')
+
+
+@dataclass(frozen=True)
+class VerificationKey:
+    """Разобранный открытый ключ."""
+
+    kid: str
+    algorithm: str
+    key: object
+
+    def to_jwk(self):
+        """Представление ключа в формате JWK."""
+        if self.algorithm == 'RS256':
+            jwk = RSAAlgorithm.to_jwk(self.key, as_dict=True)
+        else:
+            jwk = OKPAlgorithm.to_jwk(self.key, as_dict=True)
+        jwk.update({'kid': self.kid, 'alg': self.algorithm, 'use': 'sig'})
+        return jwk
+
+
+_lock = threading.Lock()
+_signing_key = None
+_verification_keys = None
+
+
+def is_asymmetric():
+    """Включен ли асимметричный режим подписи."""
+    return settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS
+
+
+def _algorithm_for(key):
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return 'RS256'
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return 'EdDSA'
+    raise ImproperlyConfigured(
+        f'Неподдерживаемый тип ключа JWT: {type(key).__name__}'
+    )
+
+
+def _load_keys():
+    """Загружает ключ подписи и все ключи проверки."""
+    global _signing_key, _verification_keys
+
+    kid = settings.JWT_SIGNING_KEY_ID
+    if not kid or not settings.JWT_PRIVATE_KEY_FILE:
+        raise ImproperlyConfigured(
+            'Для асимметричной подписи JWT нужны JWT_SIGNING_KEY_ID '
+            'и JWT_PRIVATE_KEY_FILE'
+        )
+
+    private_key = serialization.load_pem_private_key(
+        Path(settings.JWT_PRIVATE_KEY_FILE).read_bytes(), password=None
+    )
+    algorithm = _algorithm_for(private_key)
+    if algorithm != settings.JWT_ALGORITHM:
+        raise ImproperlyConfigured(
+            f'Ключ {kid} не подходит для алгоритма {settings.JWT_ALGORITHM}'
+        )
+
+    keys = {}
+    if settings.JWT_PUBLIC_KEYS_DIR:
+        for path in sorted(Path(settings.JWT_PUBLIC_KEYS_DIR).glob('*.pem')):
+            public_key = serialization.load_pem_public_key(path.read_bytes())
+            keys[path.stem] = VerificationKey(
+                path.stem, _algorithm_for(public_key), public_key
+            )
+    keys[kid] = VerificationKey(kid, algorithm, private_key.public_key())
+
+    _signing_key = (kid, algorithm, private_key)
+    _verification_keys = keys
+
+
+def _ensure_loaded():
+    if _verification_keys is None:
+        with _lock:
+            if _verification_keys is None:
+                _load_keys()
+
+
+def get_verification_keys():
+    """Все действующие ключи проверки по kid."""
+    if not is_asymmetric():
+        return {}
+    _ensure_loaded()
+    return _verification_keys
+
+
+def encode_jwt(payload):
+    """Подписывает payload текущим ключом."""
+    if not is_asymmetric():
+        return jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+
+    _ensure_loaded()
+    kid, algorithm, private_key = _signing_key
+    return jwt.encode(
+        payload, private_key, algorithm=algorithm, headers={'kid': kid}
+    )
+
+
+def decode_jwt(token):
+    """Проверяет подпись и срок действия токена, возвращает claims."""
+    if not is_asymmetric():
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+
+    kid = jwt.get_unverified_header(token).get('kid')
+    verification_key = get_verification_keys().get(kid)
+    if verification_key is None:
+        raise jwt.InvalidTokenError(f'Неизвестный kid: {kid}')
+    return jwt.decode(
+        token, verification_key.key, algorithms=[verification_key.algorithm]
+    )
+
+
+def get_jwks():
+    """Набор открытых ключей в формате JWKS."""
+    return {
+        'keys': [key.to_jwk() for key in get_verification_keys().values()]
+    }
+
+
+def reset_keys():
+    """Сбрасывает разобранные ключи, они будут загружены заново."""
+    global _signing_key, _verification_keys
+    with _lock:
+        _signing_key = None
+        _verification_keys = None
+
+
+@receiver(setting_changed)
+def reset_keys_on_setting_change(setting, **kwargs):
+    """Сбрасывает ключи при изменении настроек JWT (в тестах)."""
+    if setting.startswith('JWT_'):
+        reset_keys()
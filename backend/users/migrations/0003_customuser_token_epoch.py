@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_alter_customuser_managers"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="token_epoch",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Эпоха токенов"
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_customuser_token_epoch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RefreshToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "token_hash",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="Дайджест токена"
+                    ),
+                ),
+                (
+                    "family",
+                    models.UUIDField(db_index=True, verbose_name="Цепочка ротации"),
+                ),
+                (
+                    "token_epoch",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Эпоха токенов"
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(verbose_name="Истекает")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "revoked_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Дата отзыва"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="refresh_tokens",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Refresh-токен",
+                "verbose_name_plural": "Refresh-токены",
+                "db_table": "refresh_tokens",
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0004_refreshtoken"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthSession",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "token_hash",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="Дайджест токена"
+                    ),
+                ),
+                (
+                    "token_epoch",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Эпоха токенов"
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(verbose_name="Истекает")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="auth_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Сессия",
+                "verbose_name_plural": "Сессии",
+                "db_table": "auth_sessions",
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0005_authsession"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="APIKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="Название")),
+                (
+                    "prefix",
+                    models.CharField(
+                        max_length=12, unique=True, verbose_name="Префикс"
+                    ),
+                ),
+                (
+                    "key_hash",
+                    models.CharField(max_length=64, verbose_name="Дайджест ключа"),
+                ),
+                (
+                    "scopes",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Права по типам ресурсов"
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(default=True, verbose_name="Активен"),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Истекает"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="api_keys",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Владелец",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "API-ключ",
+                "verbose_name_plural": "API-ключи",
+                "db_table": "api_keys",
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0006_apikey"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                fields=["-date_joined", "-id"], name="users_joined_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0007_customuser_users_joined_id_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="customuser",
+            name="users_joined_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-date_joined", "-id"],
+                name="users_active_joined_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0008_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="authsession",
+            name="expires_at",
+            field=models.DateTimeField(db_index=True, verbose_name="Истекает"),
+        ),
+        migrations.AlterField(
+            model_name="refreshtoken",
+            name="expires_at",
+            field=models.DateTimeField(db_index=True, verbose_name="Истекает"),
+        ),
+    ]
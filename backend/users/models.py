@@ -1,9 +1,25 @@
+import hashlib
+import secrets
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 import bcrypt
 
+from . import hashers
+from .token_cache import (
+    token_epoch_key, user_snapshot_key, verified_api_keys, verified_tokens
+)
+
 
 class CustomUserManager(BaseUserManager):
     """Кастомный менеджер для создания пользователей."""
@@ -48,6 +64,9 @@ class CustomUser(AbstractUser):
     deleted_at = models.DateTimeField(
         null=True, blank=True, verbose_name='Дата удаления'
     )
+    token_epoch = models.PositiveIntegerField(
+        default=0, verbose_name='Эпоха токенов'
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
@@ -58,6 +77,14 @@ class CustomUser(AbstractUser):
         verbose_name = _('user')
         verbose_name_plural = _('users')
         db_table = 'users'
+        indexes = [
+            # Keyset-пагинация активных пользователей по (date_joined, id)
+            models.Index(
+                fields=['-date_joined', '-id'],
+                condition=models.Q(is_active=True),
+                name='users_active_joined_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.email
@@ -66,22 +93,283 @@ class CustomUser(AbstractUser):
         """Мягкое удаление пользователя."""
         self.is_active = False
         self.deleted_at = timezone.now()
-        self.save()
+        self.save(update_fields=['is_active', 'deleted_at'])
+        self.revoke_all_tokens()
+
+    def revoke_all_tokens(self):
+        """Отзывает все выпущенные токены пользователя."""
+        CustomUser.objects.filter(pk=self.pk).update(
+            token_epoch=F('token_epoch') + 1
+        )
+        self.refresh_from_db(fields=['token_epoch'])
+        cache.set(token_epoch_key(self.pk), self.token_epoch, timeout=None)
+        cache.delete(user_snapshot_key(self.pk))
+        verified_tokens.invalidate_user(self.pk)
 
     def set_password(self, raw_password):
-        """Хеширование пароля с помощью bcrypt."""
+        """Хеширование пароля с помощью bcrypt в пуле хеширования."""
         if isinstance(raw_password, str):
             raw_password = raw_password.encode('utf-8')
-        salt = bcrypt.gensalt()
-        self.password = bcrypt.hashpw(raw_password, salt).decode('utf-8')
+        salt = bcrypt.gensalt(settings.AUTH_BCRYPT_ROUNDS)
+        self.password = hashers.hasher_pool.hashpw(
+            raw_password, salt
+        ).decode('utf-8')
 
     def check_password(self, raw_password):
-        """Проверка пароля."""
+        """Проверка пароля. При смене стоимости bcrypt хеш пересчитывается."""
         if isinstance(raw_password, str):
             raw_password = raw_password.encode('utf-8')
-        return bcrypt.checkpw(raw_password, self.password.encode('utf-8'))
+        valid = hashers.hasher_pool.checkpw(
+            raw_password, self.password.encode('utf-8')
+        )
+        if valid and self._needs_rehash():
+            self.set_password(raw_password)
+            self.save(update_fields=['password'])
+        return valid
+
+    async def acheck_password(self, raw_password):
+        """Асинхронная проверка пароля для ASGI."""
+        if isinstance(raw_password, str):
+            raw_password = raw_password.encode('utf-8')
+        valid = await hashers.hasher_pool.acheckpw(
+            raw_password, self.password.encode('utf-8')
+        )
+        if valid and self._needs_rehash():
+            self.password = (await hashers.hasher_pool.ahashpw(
+                raw_password, bcrypt.gensalt(settings.AUTH_BCRYPT_ROUNDS)
+            )).decode('utf-8')
+            await self.asave(update_fields=['password'])
+        return valid
+
+    def _needs_rehash(self):
+        """Стоимость сохраненного хеша отличается от AUTH_BCRYPT_ROUNDS."""
+        return self.pk is not None and (
+            hashers.bcrypt_rounds(self.password) != settings.AUTH_BCRYPT_ROUNDS
+        )
 
     @property
     def full_name(self):
         """Полное имя пользователя."""
         return f"{self.last_name} {self.first_name}"
+
+
+def hash_refresh_token(token):
+    """SHA-256 дайджест refresh-токена для хранения в БД."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class RefreshTokenManager(models.Manager):
+    """Менеджер для выпуска refresh-токенов."""
+
+    def issue(self, user, family=None):
+        """Создает refresh-токен и возвращает его открытое значение."""
+        token = secrets.token_urlsafe(32)
+        self.create(
+            user=user,
+            token_hash=hash_refresh_token(token),
+            family=family or uuid.uuid4(),
+            token_epoch=user.token_epoch,
+            expires_at=timezone.now() + timezone.timedelta(
+                seconds=settings.JWT_REFRESH_TOKEN_LIFETIME
+            ),
+        )
+        return token
+
+
+class RefreshToken(models.Model):
+    """Refresh-токен с ротацией. Хранится только дайджест значения."""
+
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='refresh_tokens',
+        verbose_name='Пользователь'
+    )
+    token_hash = models.CharField(
+        max_length=64, unique=True, verbose_name='Дайджест токена'
+    )
+    family = models.UUIDField(
+        db_index=True, verbose_name='Цепочка ротации'
+    )
+    token_epoch = models.PositiveIntegerField(
+        default=0, verbose_name='Эпоха токенов'
+    )
+    expires_at = models.DateTimeField(db_index=True, verbose_name='Истекает')
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Дата создания'
+    )
+    revoked_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Дата отзыва'
+    )
+
+    objects = RefreshTokenManager()
+
+    class Meta:
+        verbose_name = 'Refresh-токен'
+        verbose_name_plural = 'Refresh-токены'
+        db_table = 'refresh_tokens'
+
+    def __str__(self):
+        return f"{self.user_id} - {self.family}"
+
+    @property
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+    def revoke_family(self):
+        """Отзывает все токены цепочки ротации."""
+        return RefreshToken.objects.filter(
+            family=self.family, revoked_at__isnull=True
+        ).update(revoked_at=timezone.now())
+
+
+class AuthSession(models.Model):
+    """Сессия opaque-токена. Резервное хранилище для кэша сессий."""
+
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='auth_sessions',
+        verbose_name='Пользователь'
+    )
+    token_hash = models.CharField(
+        max_length=64, unique=True, verbose_name='Дайджест токена'
+    )
+    token_epoch = models.PositiveIntegerField(
+        default=0, verbose_name='Эпоха токенов'
+    )
+    expires_at = models.DateTimeField(db_index=True, verbose_name='Истекает')
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Дата создания'
+    )
+
+    class Meta:
+        verbose_name = 'Сессия'
+        verbose_name_plural = 'Сессии'
+        db_table = 'auth_sessions'
+
+    def __str__(self):
+        return f"{self.user_id} - {self.expires_at}"
+
+
+API_KEY_PREFIX = 'ak_'
+API_KEY_ACTIONS = ('create', 'read', 'update', 'delete')
+
+
+def hash_api_key(key):
+    """SHA-256 дайджест API-ключа для хранения в БД."""
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def parse_api_key(key):
+    """Возвращает префикс ключа или None для строки другого формата."""
+    if not key.startswith(API_KEY_PREFIX):
+        return None
+    prefix, _, secret = key[len(API_KEY_PREFIX):].partition('_')
+    if not prefix or not secret:
+        return None
+    return prefix
+
+
+class APIKeyManager(models.Manager):
+    """Менеджер для выпуска API-ключей."""
+
+    def issue(self, user, name, scopes, expires_at=None):
+        """Создает ключ и возвращает (APIKey, открытое значение ключа)."""
+        prefix = secrets.token_hex(6)
+        key = f'{API_KEY_PREFIX}{prefix}_{secrets.token_urlsafe(32)}'
+        api_key = self.create(
+            user=user,
+            name=name,
+            prefix=prefix,
+            key_hash=hash_api_key(key),
+            scopes=scopes,
+            expires_at=expires_at,
+        )
+        return api_key, key
+
+
+class APIKey(models.Model):
+    """
+    API-ключ сервисного клиента.
+
+    Ключ действует от имени пользователя-владельца, но только в пределах
+    scopes: {имя типа ресурса: [действия]}. Хранится только дайджест.
+    """
+
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='api_keys',
+        verbose_name='Владелец'
+    )
+    name = models.CharField(max_length=100, verbose_name='Название')
+    prefix = models.CharField(
+        max_length=12, unique=True, verbose_name='Префикс'
+    )
+    key_hash = models.CharField(max_length=64, verbose_name='Дайджест ключа')
+    scopes = models.JSONField(
+        default=dict, blank=True, verbose_name='Права по типам ресурсов'
+    )
+    is_active = models.BooleanField(default=True, verbose_name='Активен')
+    expires_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Истекает'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Дата создания'
+    )
+
+    objects = APIKeyManager()
+
+    class Meta:
+        verbose_name = 'API-ключ'
+        verbose_name_plural = 'API-ключи'
+        db_table = 'api_keys'
+
+    def __str__(self):
+        return f"{self.name} ({self.prefix})"
+
+    def clean(self):
+        """Валидация: scopes ссылаются на существующие типы ресурсов."""
+        if not isinstance(self.scopes, dict):
+            raise ValidationError({'scopes': 'Ожидается объект {тип: [действия]}'})
+        ResourceType = apps.get_model('permissions', 'ResourceType')
+        known = set(ResourceType.objects.filter(
+            name__in=list(self.scopes)
+        ).values_list('name', flat=True))
+        for resource_type, actions in self.scopes.items():
+            if resource_type not in known:
+                raise ValidationError(
+                    {'scopes': f'Неизвестный тип ресурса: {resource_type}'}
+                )
+            if not set(actions) <= set(API_KEY_ACTIONS):
+                raise ValidationError(
+                    {'scopes': f'Неизвестное действие для {resource_type}'}
+                )
+
+    @property
+    def is_expired(self):
+        return self.expires_at is not None and self.expires_at <= timezone.now()
+
+    def allows(self, resource_type, action):
+        """Разрешает ли ключ действие с типом ресурса."""
+        name = getattr(resource_type, 'name', resource_type)
+        return action in self.scopes.get(name, ())
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_verified_tokens(sender, instance, **kwargs):
+    """Сбрасывает кэш проверенных токенов при изменении пользователя."""
+    cache.delete_many([
+        user_snapshot_key(instance.pk), token_epoch_key(instance.pk)
+    ])
+    verified_tokens.invalidate_user(instance.pk)
+    verified_api_keys.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=APIKey)
+@receiver(post_delete, sender=APIKey)
+def invalidate_verified_api_keys(sender, instance, **kwargs):
+    """Сбрасывает кэш проверенных ключей владельца."""
+    verified_api_keys.invalidate_user(instance.user_id)
@@ -0,0 +1,24 @@
+"""
+Ограничение доступа по API-ключу.
+
+Scopes ключа описывают только действия над ресурсами, поэтому по
+умолчанию ключ не дает доступа ни к чему, кроме действий, которые view
+явно перечисляет в api_key_actions и где scopes проверяются. Управление
+аккаунтом, токенами, ролями и правами доступно только по токену входа.
+"""
+from rest_framework.permissions import BasePermission
+
+from .models import APIKey
+
+
+class APIKeyScopePermission(BasePermission):
+    """Запрещает запросы по API-ключу вне api_key_actions view."""
+
+    message = 'API-ключ не дает доступа к этому действию'
+
+    def has_permission(self, request, view):
+        if not isinstance(request.auth, APIKey):
+            return True
+        return getattr(view, 'action', None) in getattr(
+            view, 'api_key_actions', ()
+        )
@@ -0,0 +1,191 @@
+"""
+Хранилище отозванных токенов по jti.
+
+Отзыв записывается в общий кэш ключом revoked_jti_{jti} на оставшееся
+время жизни токена. Перед ним стоит Bloom-фильтр в памяти процесса:
+отрицательный ответ фильтра означает «точно не отозван» и не требует
+обращения к кэшу. Фильтр периодически подтягивает новые отзывы из журнала
+в общем кэше, поэтому отзыв, сделанный в другом процессе, становится виден
+не позже чем через AUTH_REVOCATION_REFRESH_INTERVAL секунд.
+
+Если счетчик журнала вытеснен из кэша, отзывы до этого момента в журнале
+уже не найти. Счетчик создается заново вместе с меткой сброса, и пока
+она жива (время жизни токена), каждый jti проверяется в кэше без фильтра.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+REVOKED_JTI_KEY = 'revoked_jti_{}'
+REVOCATION_SEQ_KEY = 'revoked_jti_seq'
+REVOCATION_LOG_KEY = 'revoked_jti_log_{}'
+REVOCATION_RESET_KEY = 'revoked_jti_reset'
+REVOCATION_LOG_CHUNK = 500
+
+
+class BloomFilter:
+    """Простой Bloom-фильтр на bytearray с двойным хешированием."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return (
+            (first + i * second) % self.size for i in range(self.hash_count)
+        )
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationStore:
+    """Отзыв токенов по jti с Bloom-фильтром перед общим кэшем."""
+
+    def __init__(self, capacity, error_rate, refresh_interval, log_timeout):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.log_timeout = log_timeout
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_seq = 0
+        self._next_refresh = 0
+        self._check_all = False
+
+    def revoke(self, jti, exp):
+        """Отзывает токен до момента exp (unix time)."""
+        timeout = int(exp - time.time())
+        if timeout <= 0:
+            return
+        cache.set(REVOKED_JTI_KEY.format(jti), True, timeout=timeout)
+
+        # Журнал живет фиксированное время, поэтому записи истекают
+        # строго по порядку номеров
+        seq = self._next_seq()
+        cache.set(
+            REVOCATION_LOG_KEY.format(seq), jti, timeout=self.log_timeout
+        )
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def is_revoked(self, jti):
+        """Проверяет, отозван ли токен."""
+        self._refresh_if_due()
+        if not self._check_all and jti not in self._bloom:
+            return False
+        return bool(cache.get(REVOKED_JTI_KEY.format(jti)))
+
+    def candidates(self, jtis):
+        """Отбирает jti, которые фильтр не исключил; их надо проверить в кэше."""
+        self._refresh_if_due()
+        if self._check_all:
+            return list(jtis)
+        return [jti for jti in jtis if jti in self._bloom]
+
+    def refresh(self):
+        """Подтягивает в фильтр отзывы, сделанные другими процессами."""
+        found = cache.get_many([REVOCATION_SEQ_KEY, REVOCATION_RESET_KEY])
+        if REVOCATION_SEQ_KEY not in found:
+            self._reset_seq()
+            found = {REVOCATION_SEQ_KEY: 0, REVOCATION_RESET_KEY: True}
+        seq = found[REVOCATION_SEQ_KEY]
+        with self._lock:
+            # Журнал неполон после сброса счетчика: фильтру нельзя верить
+            self._check_all = (
+                REVOCATION_RESET_KEY in found or seq < self._last_seq
+            )
+            rebuild = (
+                self._bloom is None
+                or seq < self._last_seq
+                or self._bloom.count > self.capacity
+            )
+            if rebuild:
+                bloom = BloomFilter(self.capacity, self.error_rate)
+                for jti in self._load_live_log(seq):
+                    bloom.add(jti)
+                self._bloom = bloom
+            elif seq > self._last_seq:
+                for jti in self._load_log(self._last_seq + 1, seq):
+                    self._bloom.add(jti)
+            self._last_seq = seq
+            self._next_refresh = time.monotonic() + self.refresh_interval
+
+    def reset(self):
+        """Сбрасывает состояние фильтра процесса."""
+        with self._lock:
+            self._bloom = None
+            self._last_seq = 0
+            self._next_refresh = 0
+            self._check_all = False
+
+    def _refresh_if_due(self):
+        if self._bloom is None or time.monotonic() >= self._next_refresh:
+            self.refresh()
+
+    def _next_seq(self):
+        try:
+            return cache.incr(REVOCATION_SEQ_KEY)
+        except ValueError:
+            self._reset_seq()
+            return cache.incr(REVOCATION_SEQ_KEY)
+
+    def _reset_seq(self):
+        """Создает счетчик журнала, если его нет, с меткой сброса."""
+        # Метка ставится до счетчика: процесс, увидевший новый счетчик,
+        # увидит и метку
+        cache.set(REVOCATION_RESET_KEY, True, timeout=self.log_timeout)
+        cache.add(REVOCATION_SEQ_KEY, 0, timeout=None)
+
+    def _load_log(self, start, end):
+        jtis = []
+        for chunk_start in range(start, end + 1, REVOCATION_LOG_CHUNK):
+            chunk_end = min(chunk_start + REVOCATION_LOG_CHUNK - 1, end)
+            keys = [
+                REVOCATION_LOG_KEY.format(n)
+                for n in range(chunk_start, chunk_end + 1)
+            ]
+            jtis.extend(cache.get_many(keys).values())
+        return jtis
+
+    def _load_live_log(self, seq):
+        """Читает журнал с конца, пока записи не начнут истекать."""
+        jtis = []
+        end = seq
+        while end > 0:
+            start = max(1, end - REVOCATION_LOG_CHUNK + 1)
+            keys = [REVOCATION_LOG_KEY.format(n) for n in range(start, end + 1)]
+            found = cache.get_many(keys)
+            jtis.extend(found.values())
+            if len(found) < len(keys):
+                break
+            end = start - 1
+        return jtis
+
+
+revoked_tokens = RevocationStore(
+    capacity=settings.AUTH_REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.AUTH_REVOCATION_BLOOM_ERROR_RATE,
+    refresh_interval=settings.AUTH_REVOCATION_REFRESH_INTERVAL,
+    log_timeout=settings.JWT_ACCESS_TOKEN_LIFETIME,
+)
@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 
+from config.serializers import SparseFieldsMixin
+
 User = get_user_model()
 
 
@@ -40,7 +43,23 @@ class UserLoginSerializer(serializers.Serializer):
     password = serializers.CharField()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class RefreshTokenSerializer(serializers.Serializer):
+    """Сериализатор для обновления access-токена."""
+
+    refresh = serializers.CharField()
+
+
+class TokenIntrospectionSerializer(serializers.Serializer):
+    """Сериализатор для пакетной проверки токенов."""
+
+    tokens = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=settings.AUTH_INTROSPECTION_MAX_TOKENS
+    )
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для отображения пользователя."""
 
     class Meta:
@@ -65,7 +84,9 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         """Обновление пользователя."""
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        # Сохраняем только измененные поля: экземпляр мог быть
+        # восстановлен из кэша токенов и содержать устаревшие колонки
+        instance.save(update_fields=list(validated_data))
         return instance
 
 
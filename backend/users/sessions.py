@@ -0,0 +1,259 @@
+"""
+Хранилища сессий для opaque-токенов.
+
+Opaque-токен — случайная строка без данных внутри. Состояние сессии
+(пользователь и эпоха токенов) хранится в подключаемом хранилище,
+выбранном в AUTH_SESSION_STORE. Сессия продлевается при каждом
+обращении (скользящий срок AUTH_SESSION_LIFETIME), отзыв — одно удаление.
+Пакетное чтение get_many (проверка токенов шлюзом) сессии не продлевает.
+"""
+import abc
+import hashlib
+import secrets
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import AuthSession
+
+OPAQUE_TOKEN_PREFIX = 'ot_'
+
+
+def is_opaque_token(token):
+    """Является ли токен opaque-токеном."""
+    return token.startswith(OPAQUE_TOKEN_PREFIX)
+
+
+def hash_session_token(token):
+    """SHA-256 дайджест токена, под которым хранится сессия."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class BaseSessionStore(abc.ABC):
+    """Базовый интерфейс хранилища сессий."""
+
+    def __init__(self, lifetime=None):
+        self.lifetime = lifetime or settings.AUTH_SESSION_LIFETIME
+
+    def create(self, user):
+        """Создает сессию и возвращает opaque-токен."""
+        token = OPAQUE_TOKEN_PREFIX + secrets.token_urlsafe(32)
+        self.save(hash_session_token(token), (user.id, user.token_epoch))
+        return token
+
+    def get(self, token):
+        """Возвращает (user_id, token_epoch) и продлевает сессию."""
+        return self.load(hash_session_token(token))
+
+    def get_many(self, tokens):
+        """{токен: (user_id, token_epoch)} найденных сессий без продления."""
+        token_hashes = {hash_session_token(token): token for token in tokens}
+        sessions = self.load_many(list(token_hashes))
+        return {
+            token_hashes[token_hash]: session
+            for token_hash, session in sessions.items()
+        }
+
+    def revoke(self, token):
+        """Отзывает сессию."""
+        self.delete(hash_session_token(token))
+
+    @abc.abstractmethod
+    def save(self, token_hash, session):
+        """Сохраняет сессию на lifetime секунд."""
+
+    @abc.abstractmethod
+    def load(self, token_hash):
+        """Сессия или None; продлевает срок."""
+
+    @abc.abstractmethod
+    def load_many(self, token_hashes):
+        """{token_hash: сессия} найденных сессий без продления."""
+
+    @abc.abstractmethod
+    def delete(self, token_hash):
+        """Удаляет сессию."""
+
+
+class CacheSessionStore(BaseSessionStore):
+    """Сессии в кэше (Redis через django-redis или любой бэкенд Django)."""
+
+    def cache_key(self, token_hash):
+        return f'auth_session_{token_hash}'
+
+    def save(self, token_hash, session):
+        cache.set(self.cache_key(token_hash), session, timeout=self.lifetime)
+
+    def load(self, token_hash):
+        key = self.cache_key(token_hash)
+        client = getattr(cache, 'client', None)
+        if hasattr(client, 'get_client'):
+            # django-redis: чтение и продление одним pipeline
+            raw_key = client.make_key(key)
+            pipeline = client.get_client(write=True).pipeline()
+            pipeline.get(raw_key)
+            pipeline.expire(raw_key, self.lifetime)
+            value, _ = pipeline.execute()
+            return None if value is None else client.decode(value)
+
+        session = cache.get(key)
+        if session is not None:
+            cache.touch(key, self.lifetime)
+        return session
+
+    def load_many(self, token_hashes):
+        keys = {
+            self.cache_key(token_hash): token_hash
+            for token_hash in token_hashes
+        }
+        return {
+            keys[key]: session
+            for key, session in cache.get_many(list(keys)).items()
+        }
+
+    def delete(self, token_hash):
+        cache.delete(self.cache_key(token_hash))
+
+
+class DatabaseSessionStore(BaseSessionStore):
+    """Сессии в таблице auth_sessions."""
+
+    def save(self, token_hash, session):
+        user_id, token_epoch = session
+        AuthSession.objects.update_or_create(
+            token_hash=token_hash,
+            defaults={
+                'user_id': user_id,
+                'token_epoch': token_epoch,
+                'expires_at': self._expires_at(),
+            }
+        )
+
+    def load(self, token_hash):
+        row = self.load_row(token_hash)
+        return None if row is None else row[:2]
+
+    def load_row(self, token_hash):
+        """(user_id, token_epoch, expires_at) с продлением срока."""
+        now = timezone.now()
+        row = AuthSession.objects.filter(
+            token_hash=token_hash, expires_at__gt=now
+        ).values_list('user_id', 'token_epoch', 'expires_at').first()
+        if row is None:
+            return None
+
+        user_id, token_epoch, expires_at = row
+        if self.needs_extend(expires_at):
+            expires_at = self.extend(token_hash)
+        return (user_id, token_epoch, expires_at)
+
+    def needs_extend(self, expires_at):
+        """
+        Пора ли продлить срок в БД.
+
+        Продлеваем, когда прошло больше половины срока, а не на каждом
+        запросе, чтобы не писать в БД при каждом обращении.
+        """
+        return expires_at - timezone.now() < timedelta(
+            seconds=self.lifetime / 2
+        )
+
+    def extend(self, token_hash):
+        """Продлевает сессию в БД, возвращает новый срок."""
+        expires_at = self._expires_at()
+        AuthSession.objects.filter(token_hash=token_hash).update(
+            expires_at=expires_at
+        )
+        return expires_at
+
+    def load_many(self, token_hashes):
+        rows = AuthSession.objects.filter(
+            token_hash__in=token_hashes, expires_at__gt=timezone.now()
+        ).values_list('token_hash', 'user_id', 'token_epoch')
+        return {
+            token_hash: (user_id, token_epoch)
+            for token_hash, user_id, token_epoch in rows
+        }
+
+    def delete(self, token_hash):
+        AuthSession.objects.filter(token_hash=token_hash).delete()
+
+    def _expires_at(self):
+        return timezone.now() + timedelta(seconds=self.lifetime)
+
+
+class CachedDatabaseSessionStore(CacheSessionStore):
+    """
+    Кэш перед таблицей сессий: сессия переживает потерю кэша.
+
+    В кэше рядом с сессией хранится ее срок в БД: скользящий срок
+    переносится в БД так же, как в DatabaseSessionStore, после половины
+    срока, без чтения таблицы на каждом запросе.
+    """
+
+    def __init__(self, lifetime=None):
+        super().__init__(lifetime)
+        self.database = DatabaseSessionStore(self.lifetime)
+
+    def cache_key(self, token_hash):
+        # Запись кэша — (user_id, token_epoch, срок в БД)
+        return f'auth_session_db_{token_hash}'
+
+    def save(self, token_hash, session):
+        # Срок в кэше не позже срока в БД
+        expires_at = self.database._expires_at()
+        self.database.save(token_hash, session)
+        super().save(token_hash, (*session, expires_at))
+
+    def load(self, token_hash):
+        entry = super().load(token_hash)
+        if entry is None:
+            entry = self.database.load_row(token_hash)
+            if entry is None:
+                return None
+            super().save(token_hash, entry)
+            return entry[:2]
+
+        user_id, token_epoch, expires_at = entry
+        if self.database.needs_extend(expires_at):
+            expires_at = self.database.extend(token_hash)
+            super().save(token_hash, (user_id, token_epoch, expires_at))
+        return (user_id, token_epoch)
+
+    def load_many(self, token_hashes):
+        # Промахи кэша читаются из БД одним запросом и не кэшируются:
+        # запись в кэш продлила бы сессию
+        sessions = {
+            token_hash: entry[:2]
+            for token_hash, entry in super().load_many(token_hashes).items()
+        }
+        missing = [
+            token_hash for token_hash in token_hashes
+            if token_hash not in sessions
+        ]
+        if missing:
+            sessions.update(self.database.load_many(missing))
+        return sessions
+
+    def delete(self, token_hash):
+        self.database.delete(token_hash)
+        super().delete(token_hash)
+
+
+@lru_cache(maxsize=None)
+def get_session_store():
+    """Хранилище сессий из настройки AUTH_SESSION_STORE."""
+    return import_string(settings.AUTH_SESSION_STORE)()
+
+
+@receiver(setting_changed)
+def reset_session_store(setting, **kwargs):
+    """Сбрасывает хранилище при изменении настроек (в тестах)."""
+    if setting in ('AUTH_SESSION_STORE', 'AUTH_SESSION_LIFETIME'):
+        get_session_store.cache_clear()
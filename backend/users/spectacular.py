@@ -15,3 +15,33 @@ class CustomJWTAuthenticationScheme(OpenApiAuthenticationExtension):
             token_prefix='Bearer',
             bearer_format='JWT'
         )
+
+
+class OpaqueTokenAuthenticationScheme(OpenApiAuthenticationExtension):
+    """Схема аутентификации для OpaqueTokenAuthentication в drf-spectacular."""
+
+    target_class = 'users.authentication.OpaqueTokenAuthentication'
+    name = 'OpaqueToken'
+
+    def get_security_definition(self, auto_schema):
+        """Возвращает определение безопасности для OpenAPI схемы."""
+        return build_bearer_security_scheme_object(
+            header_name='Authorization',
+            token_prefix='Bearer',
+        )
+
+
+class APIKeyAuthenticationScheme(OpenApiAuthenticationExtension):
+    """Схема аутентификации для APIKeyAuthentication в drf-spectacular."""
+
+    target_class = 'users.authentication.APIKeyAuthentication'
+    name = 'ApiKey'
+
+    def get_security_definition(self, auto_schema):
+        """Возвращает определение безопасности для OpenAPI схемы."""
+        return {
+            'type': 'apiKey',
+            'in': 'header',
+            'name': 'Authorization',
+            'description': 'Api-Key <ключ>',
+        }
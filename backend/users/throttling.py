@@ -0,0 +1,131 @@
+"""
+Ограничение попыток входа до проверки пароля.
+
+Скользящее окно по email, IP и глобально. Счетчики лежат в общем кэше
+по одному на окно и увеличиваются атомарным incr; оценка за скользящее
+окно — текущий счетчик плюс доля предыдущего. Троттлинг выполняется
+в DRF до тела view, то есть до поиска пользователя и bcrypt.
+"""
+import hashlib
+import time
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+LOGIN_THROTTLE_KEY = 'login_throttle_{scope}_{ident}_{window}'
+LOGIN_THROTTLE_SCOPES = ('email', 'ip', 'global')
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60), в формате DEFAULT_THROTTLE_RATES DRF."""
+    num, period = rate.split('/')
+    return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+def _ident(value):
+    """Короткий дайджест, чтобы произвольный ввод не попадал в ключ кэша."""
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:32]
+
+
+def _increment(key, timeout):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout=timeout):
+            return 1
+        return cache.incr(key)
+
+
+class SlidingWindowCounter:
+    """Счетчик попыток в скользящем окне duration секунд."""
+
+    def __init__(self, scope, ident, limit, duration):
+        self.scope = scope
+        self.ident = ident
+        self.limit = limit
+        self.duration = duration
+
+    def _keys(self, now):
+        window = int(now // self.duration)
+        return tuple(
+            LOGIN_THROTTLE_KEY.format(
+                scope=self.scope, ident=self.ident, window=n
+            )
+            for n in (window, window - 1)
+        )
+
+    def _weight(self, now):
+        """Доля предыдущего окна, еще попадающая в скользящее окно."""
+        return 1 - (now % self.duration) / self.duration
+
+    def hit(self, now):
+        """Учитывает попытку, возвращает оценку числа попыток в окне."""
+        current_key, previous_key = self._keys(now)
+        current = _increment(current_key, timeout=self.duration * 2)
+        previous = cache.get(previous_key) or 0
+        return current + previous * self._weight(now)
+
+    def count(self, now):
+        """Оценка числа попыток в окне без учета новой."""
+        current_key, previous_key = self._keys(now)
+        found = cache.get_many([current_key, previous_key])
+        return (
+            found.get(current_key, 0)
+            + found.get(previous_key, 0) * self._weight(now)
+        )
+
+
+def get_login_counters(email=None, ip=None):
+    """Текущие счетчики попыток входа по ключам."""
+    now = time.time()
+    idents = {'email': email and email.lower(), 'ip': ip, 'global': 'all'}
+    counters = {}
+    for scope, value in idents.items():
+        if not value:
+            continue
+        limit, duration = parse_rate(settings.AUTH_LOGIN_THROTTLE_RATES[scope])
+        counter = SlidingWindowCounter(scope, _ident(value), limit, duration)
+        counters[scope] = {
+            'count': round(counter.count(now), 2),
+            'limit': limit,
+            'window': duration,
+        }
+    return counters
+
+
+class LoginRateThrottle(BaseThrottle):
+    """Троттлинг попыток входа по email, IP и глобально."""
+
+    def allow_request(self, request, view):
+        now = time.time()
+        # Тело может быть JSON-списком или скаляром: тогда только IP
+        email = (
+            request.data.get('email') if isinstance(request.data, Mapping)
+            else None
+        )
+        idents = {
+            'email': email.lower() if isinstance(email, str) else None,
+            'ip': self.get_ident(request),
+            'global': 'all',
+        }
+
+        self.retry_after = None
+        for scope in LOGIN_THROTTLE_SCOPES:
+            rate = settings.AUTH_LOGIN_THROTTLE_RATES.get(scope)
+            if not rate or not idents[scope]:
+                continue
+            limit, duration = parse_rate(rate)
+            counter = SlidingWindowCounter(
+                scope, _ident(idents[scope]), limit, duration
+            )
+            # Отклоненные попытки тоже учитываются: перебор по email или IP
+            # остается заблокированным, пока не прекратится
+            if counter.hit(now) > limit:
+                self.retry_after = duration - now % duration
+                return False
+        return True
+
+    def wait(self):
+        return self.retry_after
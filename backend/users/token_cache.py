@@ -0,0 +1,107 @@
+"""
+Кэш проверенных токенов в памяти процесса.
+
+Позволяет повторным запросам с тем же токеном обходиться без
+jwt.decode и без запроса пользователя к БД.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+def user_snapshot_key(user_id):
+    """Ключ снимка пользователя в общем кэше."""
+    return f'auth_user_{user_id}'
+
+
+def token_epoch_key(user_id):
+    """Ключ эпохи токенов пользователя в общем кэше."""
+    return f'token_epoch_{user_id}'
+
+
+def token_digest(token):
+    """SHA-256 дайджест токена, используемый как ключ кэша."""
+    if isinstance(token, str):
+        token = token.encode('utf-8')
+    return hashlib.sha256(token).digest()
+
+
+class VerifiedTokenCache:
+    """
+    Ограниченный LRU-кэш проверенных токенов.
+
+    Запись живет до exp токена, но не дольше ttl секунд: так изменения
+    пользователя, сделанные в другом процессе, видны не позже чем через ttl.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Возвращает значение или None, если записи нет или она истекла."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, value = entry
+            if expires_at <= now:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at, user_id=None):
+        """Сохраняет значение до expires_at (unix time)."""
+        expires_at = min(expires_at, time.time() + self.ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, user_id, value)
+            if user_id is not None:
+                self._keys_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate_user(self, user_id):
+        """Удаляет все записи пользователя."""
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Полностью очищает кэш."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        _, user_id, _ = self._entries.pop(key)
+        if user_id is not None:
+            keys = self._keys_by_user.get(user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[user_id]
+
+
+verified_tokens = VerifiedTokenCache(
+    maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl=settings.AUTH_TOKEN_CACHE_TTL,
+)
+
+verified_api_keys = VerifiedTokenCache(
+    maxsize=settings.AUTH_API_KEY_CACHE_SIZE,
+    ttl=settings.AUTH_API_KEY_CACHE_TTL,
+)
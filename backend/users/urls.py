@@ -19,9 +19,24 @@ urlpatterns = [
     path('auth/login/', UserViewSet.as_view(
         {'post': 'login'}
     ), name='user-login'),
+    path('auth/refresh/', UserViewSet.as_view(
+        {'post': 'refresh'}
+    ), name='user-refresh'),
     path('auth/logout/', UserViewSet.as_view(
         {'post': 'logout'}
     ), name='user-logout'),
+    path('auth/jwks/', UserViewSet.as_view(
+        {'get': 'jwks'}
+    ), name='user-jwks'),
+    path('auth/introspect/', UserViewSet.as_view(
+        {'post': 'introspect'}
+    ), name='user-introspect'),
+    path('auth/login-throttle/', UserViewSet.as_view(
+        {'get': 'login_throttle'}
+    ), name='user-login-throttle'),
+    path('auth/logout-all/', UserViewSet.as_view(
+        {'post': 'logout_all'}
+    ), name='user-logout-all'),
 
     # Управление профилем
     path('profile/me/', UserViewSet.as_view(
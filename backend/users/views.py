@@ -1,41 +1,59 @@
 import logging
+import uuid
+from collections.abc import Mapping
 
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import authenticate
+from django.db import transaction
 from django.utils import timezone
 from django.conf import settings
-from django.core.cache import cache
 from drf_spectacular.utils import extend_schema
-import jwt
 
-from .models import CustomUser
+from config.mixins import SparseFieldsQuerysetMixin
+
+from .introspection import introspect_tokens
+from .jwt_keys import encode_jwt, get_jwks
+from .models import CustomUser, RefreshToken, hash_refresh_token
+from .permissions import APIKeyScopePermission
+from .sessions import get_session_store
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserSerializer,
-    UserUpdateSerializer, ChangePasswordSerializer
+    UserUpdateSerializer, ChangePasswordSerializer, RefreshTokenSerializer,
+    TokenIntrospectionSerializer
 )
 from .spectacular import CustomJWTAuthenticationScheme
+from .throttling import LoginRateThrottle, get_login_counters
 
 logger = logging.getLogger('auth_system')
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet для управления пользователями."""
 
     queryset = CustomUser.objects.filter(is_active=True)
     serializer_class = UserSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, APIKeyScopePermission]
+    cursor_ordering = ('-date_joined', '-id')
 
     def get_permissions(self):
         """Установка разрешений в зависимости от действия."""
-        if self.action in ['register', 'login']:
+        if self.action in ['register', 'login', 'refresh', 'jwks']:
             return [AllowAny()]
-        elif self.action in ['list', 'retrieve']:
-            return [permissions.IsAdminUser()]
+        elif self.action in [
+            'list', 'retrieve', 'introspect', 'login_throttle'
+        ]:
+            return [permissions.IsAdminUser(), APIKeyScopePermission()]
         return super().get_permissions()
 
+    def get_throttles(self):
+        """Ограничение попыток входа до поиска пользователя и bcrypt."""
+        if self.action == 'login':
+            return [LoginRateThrottle()]
+        return super().get_throttles()
+
     def get_serializer_class(self):
         """Выбор сериализатора в зависимости от действия."""
         if self.action == 'create':
@@ -59,13 +77,14 @@ class UserViewSet(viewsets.ModelViewSet):
             user = serializer.save()
             logger.info(f"Пользователь успешно зарегистрирован: {user.email}")
 
-            # Создаем JWT токен
-            token = self._create_jwt_token(user)
+            # Создаем access-токен
+            token = self._issue_access_token(user)
 
             return Response({
                 'message': 'Пользователь успешно зарегистрирован',
                 'user': UserSerializer(user).data,
-                'token': token
+                'token': token,
+                'refresh': RefreshToken.objects.issue(user)
             }, status=status.HTTP_201_CREATED)
 
         logger.warning(f"Ошибка регистрации: {serializer.errors}")
@@ -79,25 +98,25 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def login(self, request):
         """Вход пользователя в систему."""
-        logger.info(f"Попытка входа пользователя: {request.data.get('email')}")
-
         serializer = UserLoginSerializer(data=request.data)
         if serializer.is_valid():
             email = serializer.validated_data['email']
             password = serializer.validated_data['password']
+            logger.info(f"Попытка входа пользователя: {email}")
 
             user = authenticate(request, username=email, password=password)
 
             if user and user.is_active:
                 logger.info(f"Пользователь успешно вошел: {user.email}")
 
-                # Создаем JWT токен
-                token = self._create_jwt_token(user)
+                # Создаем access-токен
+                token = self._issue_access_token(user)
 
                 return Response({
                     'message': 'Успешный вход',
                     'user': UserSerializer(user).data,
-                    'token': token
+                    'token': token,
+                    'refresh': RefreshToken.objects.issue(user)
                 })
             else:
                 logger.warning(f"Неудачная попытка входа: {email}")
@@ -108,6 +127,63 @@ class UserViewSet(viewsets.ModelViewSet):
         logger.warning(f"Ошибка входа: {serializer.errors}")
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(
+        tags=['authentication'],
+        summary='Обновление токена',
+        description='Выдача нового access-токена с ротацией refresh-токена'
+    )
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    def refresh(self, request):
+        """Обновление access-токена по refresh-токену."""
+        serializer = RefreshTokenSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        invalid_response = Response(
+            {'error': 'Недействительный refresh-токен'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+        # Один индексированный запрос по дайджесту, без bcrypt
+        refresh_token = RefreshToken.objects.select_related('user').filter(
+            token_hash=hash_refresh_token(serializer.validated_data['refresh'])
+        ).first()
+        if refresh_token is None:
+            return invalid_response
+
+        user = refresh_token.user
+        if (
+            refresh_token.is_expired
+            or not user.is_active
+            or refresh_token.token_epoch != user.token_epoch
+        ):
+            return invalid_response
+
+        with transaction.atomic():
+            # Условное обновление: из двух одновременных запросов
+            # с одним токеном ротацию выполнит только один
+            rotated = RefreshToken.objects.filter(
+                pk=refresh_token.pk, revoked_at__isnull=True
+            ).update(revoked_at=timezone.now())
+            if rotated:
+                new_refresh = RefreshToken.objects.issue(
+                    user, family=refresh_token.family
+                )
+
+        if not rotated:
+            # Повторное использование отозванного токена: вероятна утечка,
+            # отзываем всю цепочку
+            refresh_token.revoke_family()
+            logger.warning(
+                f"Повторное использование refresh-токена: {user.email}"
+            )
+            return invalid_response
+
+        return Response({
+            'token': self._issue_access_token(user),
+            'refresh': new_refresh
+        })
+
     @extend_schema(
         tags=['authentication'],
         summary='Выход пользователя',
@@ -122,8 +198,22 @@ class UserViewSet(viewsets.ModelViewSet):
         if auth_header.startswith('Bearer '):
             token = auth_header.split(' ')[1]
 
-            # Добавляем токен в черный список (кэш)
-            cache.set(f'revoked_token_{token}', True, timeout=86400)  # 24 часа
+            # Отзываем токен тем классом, который его принял:
+            # JWT по jti до конца срока действия, opaque-сессию удалением
+            request.successful_authenticator.revoke(token)
+
+            # Отзываем цепочку refresh-токенов, если клиент ее передал
+            refresh = (
+                request.data.get('refresh')
+                if isinstance(request.data, Mapping) else None
+            )
+            if refresh:
+                refresh_token = RefreshToken.objects.filter(
+                    token_hash=hash_refresh_token(refresh),
+                    user=request.user
+                ).first()
+                if refresh_token is not None:
+                    refresh_token.revoke_family()
 
             logger.info(f"Пользователь вышел из системы: {request.user.email}")
             return Response({'message': 'Успешный выход из системы'})
@@ -133,6 +223,61 @@ class UserViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    @extend_schema(
+        tags=['authentication'],
+        summary='Открытые ключи JWT',
+        description='JWKS для локальной проверки токенов другими сервисами'
+    )
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def jwks(self, request):
+        """Набор открытых ключей для проверки подписи токенов."""
+        response = Response(get_jwks())
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
+
+    @extend_schema(
+        tags=['authentication'],
+        summary='Проверка токенов',
+        description='Пакетная проверка токенов для шлюза',
+        request=TokenIntrospectionSerializer
+    )
+    @action(detail=False, methods=['post'])
+    def introspect(self, request):
+        """Пакетная проверка токенов."""
+        serializer = TokenIntrospectionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'results': introspect_tokens(serializer.validated_data['tokens'])
+        })
+
+    @extend_schema(
+        tags=['authentication'],
+        summary='Счетчики попыток входа',
+        description='Текущие счетчики ограничения входа по email, IP и глобально'
+    )
+    @action(detail=False, methods=['get'])
+    def login_throttle(self, request):
+        """Счетчики попыток входа."""
+        return Response(get_login_counters(
+            email=request.query_params.get('email'),
+            ip=request.query_params.get('ip'),
+        ))
+
+    @extend_schema(
+        tags=['authentication'],
+        summary='Выход со всех устройств',
+        description='Отзыв всех выпущенных токенов пользователя'
+    )
+    @action(detail=False, methods=['post'])
+    def logout_all(self, request):
+        """Выход пользователя на всех устройствах."""
+        request.user.revoke_all_tokens()
+
+        logger.info(f"Пользователь вышел на всех устройствах: {request.user.email}")
+        return Response({'message': 'Успешный выход на всех устройствах'})
+
     @extend_schema(
         tags=['profile management'],
         summary='Информация о пользователе',
@@ -143,7 +288,7 @@ class UserViewSet(viewsets.ModelViewSet):
         """Получение информации о текущем пользователе."""
         logger.debug(f"Запрос информации о пользователе: {request.user.email}")
 
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(request.user, context={'request': request})
         return Response(serializer.data)
 
     @extend_schema(
@@ -179,10 +324,17 @@ class UserViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             user = request.user
             user.set_password(serializer.validated_data['new_password'])
-            user.save()
+            user.save(update_fields=['password'])
+
+            # Отзываем все ранее выпущенные токены и выдаем новый
+            user.revoke_all_tokens()
 
             logger.info(f"Пароль пользователя изменен: {user.email}")
-            return Response({'message': 'Пароль успешно изменен'})
+            return Response({
+                'message': 'Пароль успешно изменен',
+                'token': self._issue_access_token(user),
+                'refresh': RefreshToken.objects.issue(user)
+            })
 
         logger.warning(f"Ошибка смены пароля: {serializer.errors}")
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -203,15 +355,26 @@ class UserViewSet(viewsets.ModelViewSet):
         logger.info(f"Аккаунт пользователя удален: {user.email}")
         return Response({'message': 'Аккаунт успешно удален'})
 
+    def _issue_access_token(self, user):
+        """Создание access-токена выбранного в AUTH_TOKEN_TYPE типа."""
+        if settings.AUTH_TOKEN_TYPE == 'opaque':
+            return get_session_store().create(user)
+        return self._create_jwt_token(user)
+
     def _create_jwt_token(self, user):
         """Создание JWT токена."""
+        now = timezone.now()
         payload = {
             'user_id': user.id,
             'email': user.email,
-            'exp': timezone.now() + timezone.timedelta(days=1),  # Токен на 1 день
-            'iat': timezone.now()
+            'jti': uuid.uuid4().hex,
+            'epoch': user.token_epoch,
+            'exp': now + timezone.timedelta(
+                seconds=settings.JWT_ACCESS_TOKEN_LIFETIME
+            ),
+            'iat': now
         }
 
-        # Временно используем SECRET_KEY, позже вынесем в переменные окружения
-        token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+        # Подпись HS256 или RS256/EdDSA с kid, см. JWT_ALGORITHM
+        token = encode_jwt(payload)
         return token